@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from app.ml.model_connect import (
-    transcript_generator,
-    story_generator,
-    image_generator,
-    video_generator,
-    generate_voiceover,
-    assemble_final_video,
-    complete_video_pipeline,
-
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.db.session import get_session
+from app.services.transcript_cache import cached_transcript_summary
+from app.services.pipeline_jobs import pipeline_jobs, run_pipeline
+from app.services.progress import progress_bus
+from app.ml.llm_metrics import llm_metrics
+from app.ml.async_model_connect import (
+    astory_generator,
+    astream_story_scenes,
+    aimage_generator,
+    avideo_generator,
+    agenerate_voiceover,
+    aassemble_final_video,
 )
 from app.schemas.api_response import APIResponse, TranscriptUploadResponse
 from app.schemas.ml_process_response import (
@@ -15,7 +20,10 @@ from app.schemas.ml_process_response import (
     VideoGeneratorResponse,
     VideoWithVoiceoverResponse,
 )
+import asyncio
+import json
 import logging
+import uuid
 from app.schemas.transcript_request import VideoAssembleRequest,VideoClipRequest,VideoRequest,VoiceoverRequest,StoryRequest,ImageRequest,CompletePipelineRequest
 
 
@@ -29,13 +37,15 @@ router = APIRouter()
 #! ===== Endpoints =====
 
 @router.post("/transcript", response_model=APIResponse)
-def generate_transcript(request: VideoRequest):
+async def generate_transcript(request: VideoRequest, session: Session = Depends(get_session)):
     """
-    Generate summary/transcript from YouTube video
+    Generate summary/transcript from YouTube video.
+    Transcripts and summaries are cached per videoId.
+    The database-backed cache is synchronous, so it runs in a worker thread.
     """
     try:
-        logger.info(f"Generating transcript for video ID: {request.videoId}")
-        summary = transcript_generator(request.videoId)
+        logger.info(f"Generating transcript for video ID: {request.videoId} ({request.summary_mode})")
+        summary = await asyncio.to_thread(cached_transcript_summary, session, request.videoId, summary_mode=request.summary_mode)
         
         # Check if error response (TranscriptUploadResponse is returned on error)
         if isinstance(summary, TranscriptUploadResponse):
@@ -64,13 +74,13 @@ def generate_transcript(request: VideoRequest):
 
 
 @router.post("/story", response_model=APIResponse)
-def generate_story(request: StoryRequest):
+async def generate_story(request: StoryRequest):
     """
     Generate story/script from summary
     """
     try:
         logger.info("Generating story from summary")
-        story = story_generator(request.summary)
+        story = await astory_generator(request.summary)
         
         logger.info(f"Story generated with {len(story.scenes)} scenes")
         return APIResponse(
@@ -89,8 +99,38 @@ def generate_story(request: StoryRequest):
         )
 
 
+@router.post("/story/stream")
+async def stream_story(request: StoryRequest):
+    """
+    Generate story/script from summary, streamed as Server-Sent Events.
+    Every scene is sent as a `scene` event as soon as Gemini has finished writing it,
+    so clients can start generating its image while later scenes are still being written.
+    The stream ends with an `end` event (scene count) or an `error` event.
+    """
+    logger.info("Streaming story from summary")
+
+    async def event_stream():
+        count = 0
+        try:
+            async for scene in astream_story_scenes(request.summary):
+                yield f"event: scene\ndata: {json.dumps({'index': count, 'scene': scene.model_dump()})}\n\n"
+                count += 1
+        except Exception as e:
+            logger.error(f"Error streaming story: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'message': str(e), 'scenes_count': count})}\n\n"
+            return
+        logger.info(f"Story streamed with {count} scenes")
+        yield f"event: end\ndata: {json.dumps({'scenes_count': count})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/images", response_model=APIResponse)
-def generate_images(request: ImageRequest):
+async def generate_images(request: ImageRequest):
     """
     Generate images from story scenes
     """
@@ -101,7 +141,7 @@ def generate_images(request: ImageRequest):
         from app.schemas.ml_process_response import StoryGeneratorResponse
         scenes = [StoryGeneratorResponse(**scene) for scene in request.story_data]
         
-        images = image_generator(scenes, output_dir=request.output_dir)
+        images = await aimage_generator(scenes, output_dir=request.output_dir, bypass_cache=request.bypass_cache)
         
         logger.info(f"Generated {len(images)} images successfully")
         return APIResponse(
@@ -121,7 +161,7 @@ def generate_images(request: ImageRequest):
 
 
 @router.post("/videos", response_model=APIResponse)
-def generate_videos(request: VideoClipRequest):
+async def generate_videos(request: VideoClipRequest):
     """
     Generate video clips from image scenes
     """
@@ -130,7 +170,7 @@ def generate_videos(request: VideoClipRequest):
         
         images = [ImageGeneratorResponse(**img) for img in request.image_data]
         
-        videos = video_generator(images, output_dir=request.output_dir)
+        videos = await avideo_generator(images, output_dir=request.output_dir)
         
         logger.info(f"Generated {len(videos)} videos successfully")
         return APIResponse(
@@ -150,7 +190,7 @@ def generate_videos(request: VideoClipRequest):
 
 
 @router.post("/voiceovers", response_model=APIResponse)
-def generate_voiceovers(request: VoiceoverRequest):
+async def generate_voiceovers(request: VoiceoverRequest):
     """
     Generate voiceovers for video scenes
     """
@@ -159,7 +199,7 @@ def generate_voiceovers(request: VoiceoverRequest):
         
         videos = [VideoGeneratorResponse(**vid) for vid in request.video_data]
         
-        voices = generate_voiceover(videos, output_dir=request.output_dir)
+        voices = await agenerate_voiceover(videos, output_dir=request.output_dir)
         
         logger.info(f"Generated {len(voices)} voiceovers successfully")
         return APIResponse(
@@ -179,26 +219,30 @@ def generate_voiceovers(request: VoiceoverRequest):
 
 
 @router.post("/final-video", response_model=APIResponse)
-def generate_final_video(request: VideoAssembleRequest):
+async def generate_final_video(request: VideoAssembleRequest):
     """
-    Assemble final video from scenes with voiceovers
+    Assemble final video from scenes with voiceovers.
+    With preview=true a quick low-resolution draft is rendered to a separate file
+    (e.g. to check pacing after a regeneration); the full-quality video is only
+    rendered on a request without preview.
     """
     try:
         logger.info(f"Assembling final video with {len(request.scenes_with_voiceovers)} scenes")
         
         scenes = [VideoWithVoiceoverResponse(**scene) for scene in request.scenes_with_voiceovers]
         
-        output = assemble_final_video(
+        output = await aassemble_final_video(
             scenes_with_voiceovers=scenes,
             output_file=request.output_file,
-            bg_music_path=request.bg_music_path
+            bg_music_path=request.bg_music_path,
+            preview=request.preview
         )
         
-        logger.info(f"Final video created: {output}")
+        logger.info(f"Final video created: {output.output_file} ({output.render_mode})")
         return APIResponse(
             success=True,
-            message="Final video created successfully",
-            data={"final_video": output},
+            message="Preview video created successfully" if output.preview else "Final video created successfully",
+            data={"final_video": output.output_file, "render": output.model_dump()},
             status_code=200
         )
     except Exception as e:
@@ -212,44 +256,32 @@ def generate_final_video(request: VideoAssembleRequest):
 
 # ! Complete pipeline without human interfere
 @router.post("/complete-pipeline", response_model=APIResponse)
-def run_complete_pipeline(request: CompletePipelineRequest):
+async def run_complete_pipeline(request: CompletePipelineRequest, session: Session = Depends(get_session)):
     """
-    Run the complete video generation pipeline from YouTube video ID to final video
+    Run the complete video generation pipeline from YouTube video ID to final video.
+    Waits until the video is rendered (in a worker thread); prefer /complete-pipeline/jobs for long videos.
+    The response includes the checkpoint run_id (also on failure): send it back as
+    run_id to resume a failed run without regenerating finished scenes.
     """
+    request = request.model_copy(update={"run_id": request.run_id or uuid.uuid4().hex})
     try:
-        logger.info(f"Starting complete pipeline for video ID: {request.videoId}")
-        
-        
-        logger.info("Step 1: Generating transcript...")
-        summary = transcript_generator(request.videoId)
+        logger.info(f"Starting complete pipeline for video ID: {request.videoId} (run {request.run_id})")
         
+        result = await asyncio.to_thread(run_pipeline, session, request)
         
-        if isinstance(summary, TranscriptUploadResponse):
+        if isinstance(result, TranscriptUploadResponse):
             return APIResponse(
                 success=False,
-                message=summary.message,
+                message=result.message,
                 data=None,
-                status_code=summary.status
+                status_code=result.status
             )
         
-        logger.info("Step 2: Generating story...")
-        story = story_generator(summary)
-        
-        logger.info("Step 3: Running complete video pipeline...")
-        final_video = complete_video_pipeline(
-            story_scenes=story.scenes,
-            output_video_name=request.output_video_name
-        )
-        
-        logger.info(f"Complete pipeline finished: {final_video}")
+        logger.info(f"Complete pipeline finished: {result['final_video']}")
         return APIResponse(
             success=True,
             message="Complete video pipeline executed successfully",
-            data={
-                "summary": summary,
-                "scenes_count": len(story.scenes),
-                "final_video": final_video
-            },
+            data=result,
             status_code=200
         )
     except Exception as e:
@@ -257,8 +289,167 @@ def run_complete_pipeline(request: CompletePipelineRequest):
         return APIResponse(
             success=False,
             message=f"Complete pipeline failed: {str(e)}",
+            data={"run_id": request.run_id},
+            status_code=500
+        )
+
+
+@router.post("/complete-pipeline/jobs", response_model=APIResponse)
+def submit_complete_pipeline_job(request: CompletePipelineRequest):
+    """
+    Queue the complete video pipeline as a background job and return its job id immediately.
+    Poll /complete-pipeline/jobs/{job_id} for status.
+    """
+    try:
+        job = pipeline_jobs.submit(request)
+        return APIResponse(
+            success=True,
+            message="Pipeline job queued",
+            data=job.model_dump(exclude={"result"}),
+            status_code=202
+        )
+    except ValueError as e:
+        return APIResponse(
+            success=False,
+            message=str(e),
+            data=None,
+            status_code=400
+        )
+    except Exception as e:
+        logger.error(f"Error queuing pipeline job: {str(e)}")
+        return APIResponse(
+            success=False,
+            message=f"Failed to queue pipeline job: {str(e)}",
             data=None,
             status_code=500
         )
 
 
+@router.post("/complete-pipeline/jobs/{job_id}/resume", response_model=APIResponse)
+def resume_complete_pipeline_job(job_id: str):
+    """
+    Queue a new job that resumes a failed job's checkpointed run.
+    Finished scene stages are reused; only failed or missing work is redone.
+    """
+    try:
+        job = pipeline_jobs.resume(job_id)
+    except ValueError as e:
+        return APIResponse(
+            success=False,
+            message=str(e),
+            data=None,
+            status_code=409
+        )
+    if job is None:
+        return APIResponse(
+            success=False,
+            message=f"Pipeline job {job_id} not found",
+            data=None,
+            status_code=404
+        )
+    return APIResponse(
+        success=True,
+        message=f"Pipeline job queued to resume run {job.run_id}",
+        data=job.model_dump(exclude={"result"}),
+        status_code=202
+    )
+
+
+@router.get("/complete-pipeline/jobs/{job_id}", response_model=APIResponse)
+def get_complete_pipeline_job(job_id: str):
+    """
+    Get the status of a background pipeline job
+    """
+    job = pipeline_jobs.get(job_id)
+    if job is None:
+        return APIResponse(
+            success=False,
+            message=f"Pipeline job {job_id} not found",
+            data=None,
+            status_code=404
+        )
+    return APIResponse(
+        success=True,
+        message=f"Pipeline job status: {job.status}",
+        data=job.model_dump(),
+        status_code=200
+    )
+
+
+@router.get("/complete-pipeline/jobs/{job_id}/events")
+async def stream_complete_pipeline_job_events(job_id: str):
+    """
+    Stream a pipeline job's progress as Server-Sent Events.
+    Past events are replayed first; the stream ends when the job finishes.
+    """
+    if pipeline_jobs.get(job_id) is None:
+        return APIResponse(
+            success=False,
+            message=f"Pipeline job {job_id} not found",
+            data=None,
+            status_code=404
+        )
+
+    async def event_stream():
+        async for event in progress_bus.subscribe(job_id):
+            if event is None:
+                # Comment line keeps idle connections open through proxies
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: progress\ndata: {event.model_dump_json()}\n\n"
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/complete-pipeline/jobs/{job_id}/result", response_model=APIResponse)
+def get_complete_pipeline_job_result(job_id: str):
+    """
+    Get the output of a finished background pipeline job
+    """
+    job = pipeline_jobs.get(job_id)
+    if job is None:
+        return APIResponse(
+            success=False,
+            message=f"Pipeline job {job_id} not found",
+            data=None,
+            status_code=404
+        )
+    if job.status == "FAILED":
+        return APIResponse(
+            success=False,
+            message=f"Complete pipeline failed: {job.error}",
+            data=None,
+            status_code=500
+        )
+    if job.status != "COMPLETED":
+        return APIResponse(
+            success=False,
+            message=f"Pipeline job is still {job.status.lower()}",
+            data={"job_id": job.job_id, "status": job.status, "stage": job.stage},
+            status_code=202
+        )
+    return APIResponse(
+        success=True,
+        message="Complete video pipeline executed successfully",
+        data=job.result,
+        status_code=200
+    )
+
+
+@router.get("/llm-metrics", response_model=APIResponse)
+def get_llm_metrics():
+    """
+    LLM call statistics since startup, per operation: calls, errors, input/output
+    tokens, prompt characters, latency and parse success, plus the most recent calls
+    """
+    return APIResponse(
+        success=True,
+        message="LLM metrics",
+        data=llm_metrics.snapshot(),
+        status_code=200
+    )
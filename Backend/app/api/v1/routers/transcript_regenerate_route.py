@@ -1,13 +1,15 @@
 from fastapi import HTTPException,APIRouter
+import asyncio
+from app.core.config import settings
 import logging as logger
-from app.ml.model_connect import (
-    regenerate_story_with_modifications,
-    regenerate_specific_scenes,
-    regenerate_single_image,
-    regenerate_single_video,
-    regenerate_single_voiceover,
-    modify_scene_with_user_input,
-    modify_image_prompt_and_generate
+from app.ml.async_model_connect import (
+    aregenerate_story_with_modifications,
+    aregenerate_specific_scenes,
+    aregenerate_single_image,
+    aregenerate_single_video,
+    aregenerate_single_voiceover,
+    amodify_scene_with_user_input,
+    amodify_image_prompt_and_generate
 )
 from app.schemas.api_response import APIResponse, ErrorResponse
 from app.schemas.ml_process_response import (
@@ -17,12 +19,12 @@ from app.schemas.ml_process_response import (
     VideoWithVoiceoverResponse,
     StoryGeneratorResponse
 )
-from app.schemas.transcript_request import RegenerateSpecificScenesRequest,RegenerateStoryRequest,RegenerateSingleImageRequest,RegenerateSingleVideoRequest,RegenerateSingleVoiceoverRequest,UpdateSceneRequest,ImageRequest,VideoClipRequest
+from app.schemas.transcript_request import RegenerateSpecificScenesRequest,RegenerateStoryRequest,RegenerateSingleImageRequest,RegenerateSingleVideoRequest,RegenerateSingleVoiceoverRequest,UpdateSceneRequest,BatchRegenerateImagesRequest,VideoClipRequest
 router = APIRouter()
 # ===== REGENERATION ENDPOINTS =====
 
 @router.post("/story", response_model=APIResponse)
-def regenerate_story(request: RegenerateStoryRequest):
+async def regenerate_story(request: RegenerateStoryRequest):
     """
     Regenerate or modify the story with user instructions.
     Use this when user wants to change tone, style, or add specific elements.
@@ -40,7 +42,7 @@ def regenerate_story(request: RegenerateStoryRequest):
         if request.existing_story:
             existing_story_obj = StoryListResponse(**request.existing_story)
         
-        regenerated_story = regenerate_story_with_modifications(
+        regenerated_story = await aregenerate_story_with_modifications(
             summary=request.summary,
             modifications=request.modifications,
             existing_story=existing_story_obj
@@ -64,7 +66,7 @@ def regenerate_story(request: RegenerateStoryRequest):
 
 
 @router.post("/specific-scenes", response_model=APIResponse)
-def regenerate_scenes(request: RegenerateSpecificScenesRequest):
+async def regenerate_scenes(request: RegenerateSpecificScenesRequest):
     """
     Regenerate specific scenes by their indices while keeping others intact.
     Useful when user wants to improve only certain scenes.
@@ -76,16 +78,22 @@ def regenerate_scenes(request: RegenerateSpecificScenesRequest):
         
         existing_story = StoryListResponse(**request.existing_story)
         
-        updated_story = regenerate_specific_scenes(
+        updated_story = await aregenerate_specific_scenes(
             scenes_to_regenerate=request.scene_indices,
             existing_story=existing_story,
             summary=request.summary
         )
         
-        logger.info(f"Successfully regenerated {len(request.scene_indices)} scenes")
+        regenerated = len(updated_story.regenerated_indices)
+        if updated_story.failed_scenes:
+            logger.warning(f"Failed to regenerate scenes: {[f.index for f in updated_story.failed_scenes]}")
+            message = f"Regenerated {regenerated} of {regenerated + len(updated_story.failed_scenes)} scenes"
+        else:
+            message = f"Regenerated {regenerated} scenes successfully"
+        logger.info(f"Successfully regenerated {regenerated} scenes")
         return APIResponse(
             success=True,
-            message=f"Regenerated {len(request.scene_indices)} scenes successfully",
+            message=message,
             data=updated_story.model_dump(),
             status_code=200
         )
@@ -100,7 +108,7 @@ def regenerate_scenes(request: RegenerateSpecificScenesRequest):
 
 
 @router.post("/image", response_model=APIResponse)
-def regenerate_image(request: RegenerateSingleImageRequest):
+async def regenerate_image(request: RegenerateSingleImageRequest):
     """
     Regenerate a single image for a specific scene.
     Use when user is not satisfied with a particular image.
@@ -110,9 +118,10 @@ def regenerate_image(request: RegenerateSingleImageRequest):
         
         scene = StoryGeneratorResponse(**request.scene_data)
         
-        new_image = regenerate_single_image(
+        new_image = await aregenerate_single_image(
             scene=scene,
-            output_dir=request.output_dir
+            output_dir=request.output_dir,
+            bypass_cache=request.bypass_cache
         )
         
         logger.info(f"Image regenerated: {new_image.image}")
@@ -133,7 +142,7 @@ def regenerate_image(request: RegenerateSingleImageRequest):
 
 
 @router.post("/video", response_model=APIResponse)
-def regenerate_video(request: RegenerateSingleVideoRequest):
+async def regenerate_video(request: RegenerateSingleVideoRequest):
     """
     Regenerate a single video clip for a specific scene.
     Use when user wants a different video variation.
@@ -143,7 +152,7 @@ def regenerate_video(request: RegenerateSingleVideoRequest):
         
         image_scene = ImageGeneratorResponse(**request.image_scene_data)
         
-        new_video = regenerate_single_video(
+        new_video = await aregenerate_single_video(
             image_scene=image_scene,
             output_dir=request.output_dir
         )
@@ -166,10 +175,10 @@ def regenerate_video(request: RegenerateSingleVideoRequest):
 
 
 @router.post("/voiceover", response_model=APIResponse)
-def regenerate_voiceover(request: RegenerateSingleVoiceoverRequest):
+async def regenerate_voiceover(request: RegenerateSingleVoiceoverRequest):
     """
     Regenerate a single voiceover for a specific scene.
-    Note: Currently uses gTTS, so output will be similar. 
+    Note: Currently uses gTTS, so output will be similar; unchanged narrations reuse the cached audio. 
     Future: Can add different voice options or TTS services.
     """
     try:
@@ -177,9 +186,10 @@ def regenerate_voiceover(request: RegenerateSingleVoiceoverRequest):
         
         scene = VideoGeneratorResponse(**request.scene_data)
         
-        new_voiceover = regenerate_single_voiceover(
+        new_voiceover = await aregenerate_single_voiceover(
             scene=scene,
-            output_dir=request.output_dir
+            output_dir=request.output_dir,
+            bypass_cache=request.bypass_cache
         )
         
         logger.info(f"Voiceover regenerated: {new_voiceover.voiceover}")
@@ -238,22 +248,25 @@ def update_scene(request: UpdateSceneRequest):
 
 
 @router.post("/batch-regenerate/images", response_model=APIResponse)
-def batch_regenerate_images(request: ImageRequest):
+async def batch_regenerate_images(request: BatchRegenerateImagesRequest):
     """
     Regenerate multiple images at once.
     Useful when user wants to regenerate all images or multiple images.
+    Images are requested concurrently, at most settings.NEBIUS_MAX_CONCURRENCY at a time.
+    Cached images are only reused when bypass_cache is false.
     """
     try:
         logger.info(f"Batch regenerating images for {len(request.story_data)} scenes")
         
         scenes = [StoryGeneratorResponse(**scene) for scene in request.story_data]
-        
-        new_images = []
-        for i, scene in enumerate(scenes):
-            logger.info(f"Regenerating image {i+1}/{len(scenes)}")
-            new_image = regenerate_single_image(scene, output_dir=request.output_dir)
-            if new_image:
-                new_images.append(new_image)
+        semaphore = asyncio.Semaphore(settings.NEBIUS_MAX_CONCURRENCY)
+
+        async def regenerate(scene):
+            async with semaphore:
+                return await aregenerate_single_image(scene, output_dir=request.output_dir, bypass_cache=request.bypass_cache)
+
+        results = await asyncio.gather(*(regenerate(scene) for scene in scenes))
+        new_images = [new_image for new_image in results if new_image]
         
         logger.info(f"Batch regenerated {len(new_images)} images")
         return APIResponse(
@@ -271,21 +284,21 @@ def batch_regenerate_images(request: ImageRequest):
 
 
 @router.post("/batch-regenerate/videos", response_model=APIResponse)
-def batch_regenerate_videos(request: VideoClipRequest):
+async def batch_regenerate_videos(request: VideoClipRequest):
     """
     Regenerate multiple video clips at once.
+    All clips are generated concurrently.
     """
     try:
         logger.info(f"Batch regenerating videos for {len(request.image_data)} scenes")
         
         images = [ImageGeneratorResponse(**img) for img in request.image_data]
         
-        new_videos = []
-        for i, image_scene in enumerate(images):
-            logger.info(f"Regenerating video {i+1}/{len(images)}")
-            new_video = regenerate_single_video(image_scene, output_dir=request.output_dir)
-            if new_video:
-                new_videos.append(new_video)
+        results = await asyncio.gather(*(
+            aregenerate_single_video(image_scene, output_dir=request.output_dir)
+            for image_scene in images
+        ))
+        new_videos = [new_video for new_video in results if new_video]
         
         logger.info(f"Batch regenerated {len(new_videos)} videos")
         return APIResponse(
@@ -303,7 +316,7 @@ def batch_regenerate_videos(request: VideoClipRequest):
 
 
 @router.post("/modify-scene", response_model=APIResponse)
-def modify_scene(request: dict):
+async def modify_scene(request: dict):
     """
     Modify a scene based on user input/feedback.
     AI will merge the current scene data with user's requested changes.
@@ -330,7 +343,7 @@ def modify_scene(request: dict):
         
         scene = StoryGeneratorResponse(**scene_data)
         
-        modified_scene = modify_scene_with_user_input(
+        modified_scene = await amodify_scene_with_user_input(
             scene=scene,
             user_input=user_input,
             summary=summary
@@ -360,7 +373,7 @@ def modify_scene(request: dict):
 
 
 @router.post("/modify-image", response_model=APIResponse)
-def modify_image(request: dict):
+async def modify_image(request: dict):
     """
     Modify image prompt based on user input and generate new image.
     AI will merge the current prompt with user's requested changes.
@@ -387,7 +400,7 @@ def modify_image(request: dict):
         
         scene = StoryGeneratorResponse(**scene_data)
         
-        new_image = modify_image_prompt_and_generate(
+        new_image = await amodify_image_prompt_and_generate(
             scene=scene,
             user_input=user_input,
             output_dir=output_dir
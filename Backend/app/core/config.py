@@ -1,4 +1,4 @@
-from pydantic import  AnyHttpUrl
+from pydantic import  AnyHttpUrl, Field
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,6 +11,51 @@ class Settings(BaseSettings):
     NEBIUS_API_KEYS:str
     JWT_SECRET:str
     JWT_ALGORITHM:str
+    # Shared provider clients: keep-alive pool sizes and timeouts (seconds)
+    HTTP_POOL_CONNECTIONS:int=10
+    HTTP_POOL_MAXSIZE:int=16
+    HTTP_CONNECT_TIMEOUT:float=10.0
+    HTTP_READ_TIMEOUT:float=120.0
+    NEBIUS_TIMEOUT:float=180.0
+    GENAI_TIMEOUT:float=300.0
+    # Maximum number of image generations in flight against Nebius at once
+    NEBIUS_MAX_CONCURRENCY:int=4
+    # Content-addressed cache for generated images (LRU evicted above the size limit)
+    IMAGE_CACHE_DIR:str="image_cache"
+    IMAGE_CACHE_MAX_BYTES:int=1024*1024*1024
+    # Voiceovers: concurrent TTS requests and the narration audio cache
+    TTS_MAX_CONCURRENCY:int=4
+    AUDIO_CACHE_DIR:str="audio_cache"
+    AUDIO_CACHE_MAX_BYTES:int=512*1024*1024
+    # Voiceover engine: "gtts" (Google, network) or "piper" (local, offline; needs the piper binary and a voice model)
+    VOICEOVER_ENGINE:str="gtts"
+    TTS_LANGUAGE:str="en"
+    PIPER_BINARY:str="piper"
+    PIPER_MODEL_PATH:str| None=None
+    PIPER_SPEAKER:int| None=None
+    PIPER_LENGTH_SCALE:float=1.0
+    # Veo operation polling (seconds): first poll delay, backoff ceiling and overall timeout
+    VEO_POLL_INITIAL_INTERVAL:float=5.0
+    VEO_POLL_MAX_INTERVAL:float=30.0
+    VEO_OPERATION_TIMEOUT:float=900.0
+    # Map-reduce summarization: concurrent Gemini calls and summaries merged per reduce step
+    SUMMARY_MAX_CONCURRENCY:int=4
+    SUMMARY_REDUCE_FAN_IN:int=Field(default=4, ge=2)
+    # Concurrent Gemini calls when regenerating several scenes at once
+    SCENE_REGENERATION_MAX_CONCURRENCY:int=5
+    # Extra LLM calls when structured output can't be parsed even after local JSON repair
+    LLM_PARSE_RETRIES:int=1
+    # Background complete-pipeline jobs: concurrent pipelines, render processes, finished jobs kept
+    PIPELINE_JOB_WORKERS:int=2
+    PIPELINE_RENDER_WORKERS:int=1
+    PIPELINE_JOB_HISTORY:int=200
+    # Per-run checkpoints (finished scene stages) used to resume failed pipeline runs
+    PIPELINE_CHECKPOINT_DIR:str="pipeline_checkpoints"
+    # Rendered per-scene segments reused when the final video is re-assembled
+    SEGMENT_CACHE_DIR:str="segment_cache"
+    SEGMENT_CACHE_MAX_BYTES:int=2*1024*1024*1024
+    # Scene segments rendered in parallel by the final video assembly (0: one per CPU core)
+    RENDER_SEGMENT_WORKERS:int=0
     
 
     class Config:
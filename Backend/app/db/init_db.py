@@ -1,6 +1,8 @@
 from sqlmodel import SQLModel
 from app.db.session import engine
 from app.models.user_model import User
+from app.models.videoSessions_model import VideoSessions
+from app.models.summaries_model import Summaries
 
 def init_db():
     print("Creating database tables....")
@@ -5,8 +5,13 @@ from app.db.init_db import init_db
 from app.api.v1.routers import auth_router
 from app.api.v1.routers import transcript_generate_route
 from app.api.v1.routers import transcript_regenerate_route
+from app.services.pipeline_jobs import pipeline_jobs
+from app.ml.clients import clients
+from app.ml.model_connect import warm_llm_clients, OUTPUT_DIR
+from app.ml.video_assembler import shutdown_segment_pool
 from contextlib import asynccontextmanager
 import os
+import threading
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -14,8 +19,13 @@ from fastapi.middleware.cors import CORSMiddleware
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    # Warm the LLM clients in the background so the replica accepts traffic immediately
+    threading.Thread(target=warm_llm_clients, name="llm-warmup", daemon=True).start()
     yield
-    # Shutdown (add cleanup code here if needed)
+    # Shutdown
+    pipeline_jobs.shutdown()
+    shutdown_segment_pool()
+    clients.close()
 
 def create_app()->FastAPI:
     app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
@@ -39,9 +49,10 @@ def create_app()->FastAPI:
         app.mount("/generated_images", StaticFiles(directory=generated_images_path), name="generated_images")
     
    
-    nebius_images_path = os.path.join(base_dir, "nebius_scene_images")
-    if os.path.exists(nebius_images_path):
-        app.mount("/nebius_scene_images", StaticFiles(directory=nebius_images_path), name="nebius_scene_images")
+    # Generated scene images are written here, so always serve it
+    nebius_images_path = os.path.join(base_dir, OUTPUT_DIR)
+    os.makedirs(nebius_images_path, exist_ok=True)
+    app.mount("/nebius_scene_images", StaticFiles(directory=nebius_images_path), name="nebius_scene_images")
     
  
     generated_videos_path = os.path.join(base_dir, "generated_videos")
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+
+class ArtifactCache:
+    """
+    Persistent, content-addressed cache for generated files (images, audio, ...).
+
+    Entries are stored as `<sha256 key><extension>` inside `directory`. A hit
+    refreshes the entry's mtime, and once the cache grows past `max_bytes` the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, extension: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Builds a stable cache key from everything that determines the output."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """SHA-256 of a file's contents, for keys that depend on input files."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.extension}")
+
+    def get(self, key: str, destination: str) -> bool:
+        """
+        Copies the cached artifact for `key` to `destination`.
+
+        Returns:
+            True on a cache hit, False when nothing is cached for the key
+        """
+        cached_path = self.path_for(key)
+        try:
+            shutil.copyfile(cached_path, destination)
+            os.utime(cached_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, source_path: str):
+        """Stores a copy of `source_path` under `key` and evicts old entries if needed."""
+        os.makedirs(self.directory, exist_ok=True)
+        cached_path = self.path_for(key)
+        tmp_path = f"{cached_path}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, cached_path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total_size = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_file() or not entry.name.endswith(self.extension) or entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed by another process sharing the cache directory
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+            if total_size <= self.max_bytes:
+                return
+
+            # Oldest access first
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                if total_size <= self.max_bytes:
+                    break
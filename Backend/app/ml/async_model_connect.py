@@ -0,0 +1,224 @@
+"""
+Async variants of the generation and regeneration entry points in model_connect.
+
+These are thin awaitable wrappers around the model_connect helpers, not a
+second implementation: Gemini calls are awaited on the event loop, Veo clips
+are submitted to the shared VeoOperationScheduler and their Futures awaited
+(no thread waits while a clip is generated), and the remaining work (Nebius
+images, reference uploads, TTS, rendering) runs the sync code in worker
+threads via asyncio.to_thread.
+"""
+import asyncio
+from concurrent.futures import Future
+from typing import AsyncIterator, List, Optional
+from app.core.config import settings
+from app.schemas.ml_process_response import ImageGeneratorResponse,StoryGeneratorResponse,VideoWithVoiceoverResponse,VideoGeneratorResponse,StoryListResponse,RegeneratedScenesResponse
+from app.ml.clients import clients
+from app.ml.json_repair import StreamingArrayParser
+from app.ml.llm_metrics import llm_run_config, record_retry
+from app.ml.model_connect import (
+    STORY_MODEL,
+    STORY_STREAM_OPERATION,
+    STORY_TEMPERATURE,
+    SCENE_REGENERATION_TEMPERATURE,
+    SCENE_EDIT_TEMPERATURE,
+    IMAGE_PROMPT_TEMPERATURE,
+    _structured_llm,
+    _json_mode_llm,
+    _story_prompt,
+    _finish_story_stream,
+    _parse_structured,
+    _collect_structured,
+    _story_regeneration_prompt,
+    _prepare_scene_regeneration,
+    _merge_regenerated_scenes,
+    _scene_modification_prompt,
+    _image_prompt_merge_prompt,
+    _submit_scene_videos,
+    _collect_scene_videos,
+    _submit_video_regeneration,
+    _finish_video_regeneration,
+    image_generator,
+    generate_voiceover,
+    regenerate_single_image,
+    regenerate_single_voiceover,
+    assemble_final_video,
+)
+
+
+async def _ainvoke_structured(llm, prompt: str, response_model, operation: str):
+    """Async _invoke_structured(): unparseable output is repaired locally, then requested again."""
+    for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+        if attempt:
+            record_retry(operation)
+        result = await llm.ainvoke(prompt, config=llm_run_config(operation))
+        try:
+            return _parse_structured(result, response_model, operation)
+        except ValueError as e:
+            error = e
+    raise error
+
+
+async def _abatch_structured(llm, prompts: List[str], response_model, operation: str, max_concurrency: int) -> list:
+    """Async _batch_structured(): only the prompts whose output couldn't be parsed are sent again."""
+    results = [None] * len(prompts)
+    pending = list(range(len(prompts)))
+    for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+        if not pending:
+            break
+        if attempt:
+            for _ in pending:
+                record_retry(operation)
+        outputs = await llm.abatch([prompts[i] for i in pending], config=llm_run_config(operation, max_concurrency=max_concurrency), return_exceptions=True)
+        pending = _collect_structured(pending, outputs, results, response_model, operation)
+    return results
+
+
+# ! Video Script Generator
+async def astory_generator(summary: str) -> StoryListResponse:
+    """Async story_generator()."""
+    try:
+        llm = _structured_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        return await _ainvoke_structured(llm, _story_prompt(summary), StoryListResponse, "story.generate")
+    except Exception as e:
+        print(f"Error in story generator: {e}")
+        raise Exception(f"Failed to generate story: {str(e)}")
+
+
+async def astream_story_scenes(summary: str) -> AsyncIterator[StoryGeneratorResponse]:
+    """Async stream_story_scenes(): yields each scene once its JSON object is complete."""
+    try:
+        llm = _json_mode_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        parser = StreamingArrayParser(StoryGeneratorResponse)
+        async for chunk in llm.astream(_story_prompt(summary), config=llm_run_config(STORY_STREAM_OPERATION)):
+            for scene in parser.feed(chunk.text):
+                yield scene
+    except Exception as e:
+        print(f"Error in story generator: {e}")
+        raise Exception(f"Failed to generate story: {str(e)}")
+
+    if _finish_story_stream(parser):
+        print("Streamed story could not be parsed, generating it again")
+        for scene in (await astory_generator(summary)).scenes:
+            yield scene
+
+
+# ! Image Generator
+async def aimage_generator(scenes: List[StoryGeneratorResponse], output_dir: str, max_concurrency: Optional[int] = None, bypass_cache: bool = False, progress=None) -> List[ImageGeneratorResponse]:
+    """Async image_generator(); the images are generated by its thread pool."""
+    return await asyncio.to_thread(image_generator, scenes, output_dir, max_concurrency, bypass_cache, progress)
+
+
+# ! Video Generator
+async def _await_futures(futures: List[Future]):
+    """Waits for concurrent Futures (e.g. Veo clips) without blocking a thread."""
+    await asyncio.gather(*(asyncio.wrap_future(future) for future in futures), return_exceptions=True)
+
+
+async def avideo_generator(images: List[ImageGeneratorResponse], output_dir: str = "generated_videos", progress=None) -> List[VideoGeneratorResponse]:
+    """
+    Async video_generator(): the clips are submitted to the shared
+    VeoOperationScheduler like the sync path and awaited on the event loop.
+    """
+    videos, futures = await asyncio.to_thread(_submit_scene_videos, images, output_dir, progress)
+    print("⏳ Waiting for video generation (may take a few minutes)...")
+    await _await_futures(futures)
+    return _collect_scene_videos(videos, futures)
+
+
+# ! Generate Voice and final video (local work, run in worker threads)
+async def agenerate_voiceover(scenes_with_images: List[VideoGeneratorResponse], output_dir="voice_overs", progress=None, max_concurrency: Optional[int] = None) -> List[VideoWithVoiceoverResponse]:
+    """Async generate_voiceover(); synthesis runs in worker threads."""
+    return await asyncio.to_thread(generate_voiceover, scenes_with_images, output_dir, progress, max_concurrency)
+
+
+async def aassemble_final_video(scenes_with_voiceovers: List[VideoWithVoiceoverResponse], output_file: str, bg_music_path: Optional[str] = None, progress=None, preview: bool = False):
+    """Async assemble_final_video(); rendering runs in a worker thread."""
+    return await asyncio.to_thread(assemble_final_video, scenes_with_voiceovers, output_file, bg_music_path, progress, preview)
+
+
+# ===== REGENERATION FUNCTIONS =====
+
+async def aregenerate_story_with_modifications(summary: str, modifications: str = None, existing_story: StoryListResponse = None) -> StoryListResponse:
+    """Async regenerate_story_with_modifications()."""
+    try:
+        llm = _structured_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        formatted_prompt = _story_regeneration_prompt(summary, modifications, existing_story)
+        return await _ainvoke_structured(llm, formatted_prompt, StoryListResponse, "story.regenerate")
+    except Exception as e:
+        print(f"Error regenerating story: {e}")
+        raise Exception(f"Failed to regenerate story: {str(e)}")
+
+
+async def aregenerate_specific_scenes(scenes_to_regenerate: List[int], existing_story: StoryListResponse, summary: str, max_concurrency: Optional[int] = None) -> RegeneratedScenesResponse:
+    """Async regenerate_specific_scenes(): the scenes are sent with one abatch() call."""
+    new_scenes, indices, prompts, failed_scenes = _prepare_scene_regeneration(scenes_to_regenerate, existing_story, summary)
+
+    results = []
+    if indices:
+        try:
+            llm = _structured_llm(STORY_MODEL, SCENE_REGENERATION_TEMPERATURE, StoryGeneratorResponse)
+            max_concurrency = max(1, min(max_concurrency or settings.SCENE_REGENERATION_MAX_CONCURRENCY, len(prompts)))
+            results = await _abatch_structured(llm, prompts, StoryGeneratorResponse, "scene.regenerate", max_concurrency)
+        except Exception as e:
+            print(f"Error regenerating specific scenes: {e}")
+            raise Exception(f"Failed to regenerate scenes: {str(e)}")
+
+    return _merge_regenerated_scenes(new_scenes, indices, results, failed_scenes)
+
+
+async def aregenerate_single_image(scene: StoryGeneratorResponse, output_dir: str, bypass_cache: bool = False) -> ImageGeneratorResponse:
+    """Async regenerate_single_image(); the image is generated in a worker thread."""
+    return await asyncio.to_thread(regenerate_single_image, scene, output_dir, bypass_cache)
+
+
+async def aregenerate_single_video(image_scene: ImageGeneratorResponse, output_dir: str) -> VideoGeneratorResponse:
+    """Async regenerate_single_video(); a failed generation leaves video_path empty."""
+    try:
+        video_scene, future = await asyncio.to_thread(_submit_video_regeneration, image_scene, output_dir)
+        await _await_futures([future])
+        return _finish_video_regeneration(video_scene, future)
+
+    except Exception as e:
+        print(f" Error regenerating video: {e}")
+        raise Exception(f"Failed to regenerate video: {str(e)}")
+
+
+async def aregenerate_single_voiceover(scene: VideoGeneratorResponse, output_dir: str = "voice_overs", bypass_cache: bool = False) -> VideoWithVoiceoverResponse:
+    """Async regenerate_single_voiceover(); synthesis runs in a worker thread."""
+    return await asyncio.to_thread(regenerate_single_voiceover, scene, output_dir, bypass_cache)
+
+
+async def amodify_scene_with_user_input(scene: StoryGeneratorResponse, user_input: str, summary: str = "") -> StoryGeneratorResponse:
+    """Async modify_scene_with_user_input(); returns the original scene on error."""
+    try:
+        llm = _structured_llm(STORY_MODEL, SCENE_EDIT_TEMPERATURE, StoryGeneratorResponse)
+        modified_scene = await _ainvoke_structured(llm, _scene_modification_prompt(scene, user_input, summary), StoryGeneratorResponse, "scene.modify")
+        print(f" Scene modified based on user input: {modified_scene.scene}")
+        return modified_scene
+    except Exception as e:
+        print(f" Error modifying scene: {e}")
+        return scene  # Return original on error
+
+
+async def amodify_image_prompt_and_generate(scene: StoryGeneratorResponse, user_input: str, output_dir: str) -> Optional[ImageGeneratorResponse]:
+    """Async modify_image_prompt_and_generate(); returns None on error."""
+    try:
+        llm = clients.chat(STORY_MODEL, IMAGE_PROMPT_TEMPERATURE)
+        result = await llm.ainvoke(_image_prompt_merge_prompt(scene, user_input), config=llm_run_config("image_prompt.modify"))
+        enhanced_prompt = result.content.strip()
+        print(f" Enhanced prompt: {enhanced_prompt[:100]}...")
+
+        modified_scene = StoryGeneratorResponse(
+            scene=scene.scene,
+            narration=scene.narration,
+            visual_cues=scene.visual_cues,
+            prompts=[enhanced_prompt]
+        )
+        new_image = await aregenerate_single_image(modified_scene, output_dir)
+        print(f" Image generated with modified prompt")
+        return new_image
+
+    except Exception as e:
+        print(f" Error modifying image prompt: {e}")
+        return None
@@ -0,0 +1,149 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import requests
+    from openai import OpenAI
+    from google import genai
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from app.ml.veo_scheduler import VeoOperationScheduler
+
+
+NEBIUS_BASE_URL = "https://api.studio.nebius.com/v1/"
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of pooled HTTP sessions and provider clients.
+
+    Clients are created on first use and then shared by every request and
+    worker thread, so connections (TCP + TLS) are kept alive and reused
+    instead of being opened per call. Pool sizes and timeouts come from
+    settings. Provider SDKs are imported on first use to keep startup fast.
+    """
+
+    def __init__(self):
+        # Re-entrant: factories may depend on other registry clients
+        self._lock = threading.RLock()
+        self._clients = {}
+        self._overrides = {}
+
+    def override(self, **clients):
+        """
+        Serves the given clients instead of creating them, e.g. local stand-ins
+        in benchmarks. Names are the accessor names (http_session is "http");
+        "chat" replaces the chat model of every (model, temperature) pair.
+        Clients already created are dropped; overrides are never closed.
+        """
+        with self._lock:
+            self._overrides.update(clients)
+            self._clients.clear()
+
+    def _get(self, name: str, factory):
+        with self._lock:
+            override = self._overrides.get(name.split(":", 1)[0])
+            if override is not None:
+                return override
+            if name not in self._clients:
+                self._clients[name] = factory()
+            return self._clients[name]
+
+    def http_session(self) -> "requests.Session":
+        """Keep-alive session for plain downloads (generated image URLs, ...)."""
+        def create():
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+        return self._get("http", create)
+
+    def http_timeout(self):
+        """(connect, read) timeout to pass with requests made on http_session()."""
+        return (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+
+    def nebius(self) -> "OpenAI":
+        """OpenAI-compatible client for Nebius AI Studio (Flux image generation)."""
+        def create():
+            import httpx
+            from openai import OpenAI
+
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_POOL_MAXSIZE,
+                    max_keepalive_connections=settings.HTTP_POOL_MAXSIZE,
+                ),
+                timeout=httpx.Timeout(settings.NEBIUS_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+            )
+            return OpenAI(
+                base_url=NEBIUS_BASE_URL,
+                api_key=settings.NEBIUS_API_KEYS,
+                timeout=settings.NEBIUS_TIMEOUT,
+                http_client=http_client,
+            )
+        return self._get("nebius", create)
+
+    def genai(self) -> "genai.Client":
+        """Google GenAI client (Veo video generation, file uploads)."""
+        def create():
+            from google import genai
+            from google.genai import types
+
+            # HttpOptions.timeout is in milliseconds
+            return genai.Client(http_options=types.HttpOptions(timeout=int(settings.GENAI_TIMEOUT * 1000)))
+        return self._get("genai", create)
+
+    def veo_scheduler(self) -> "VeoOperationScheduler":
+        """Shared Veo operation scheduler (one polling thread for all generations)."""
+        def create():
+            from app.ml.veo_scheduler import VeoOperationScheduler
+
+            return VeoOperationScheduler(
+                self.genai(),
+                initial_interval=settings.VEO_POLL_INITIAL_INTERVAL,
+                max_interval=settings.VEO_POLL_MAX_INTERVAL,
+                timeout=settings.VEO_OPERATION_TIMEOUT,
+            )
+        return self._get("veo_scheduler", create)
+
+    def chat(self, model: str, temperature: Optional[float] = None) -> "ChatGoogleGenerativeAI":
+        """
+        Shared Gemini chat model for a (model, temperature) pair.
+        Every call is recorded by the LLM metrics callback handler.
+        Other generation parameters can still be overridden per call, e.g.
+        `llm.invoke(prompt, generation_config={"max_output_tokens": 512})`.
+        """
+        def create():
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            from app.ml.llm_callbacks import llm_metrics_handler
+
+            options = {} if temperature is None else {"temperature": temperature}
+            return ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=settings.GOOGLE_API_KEY,
+                callbacks=[llm_metrics_handler],
+                **options,
+            )
+        return self._get(f"chat:{model}:{temperature}", create)
+
+    def close(self):
+        """Closes every created client and their connection pools."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            close = getattr(client, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception as e:
+                    print(f" Failed to close client: {e}")
+
+
+clients = ClientRegistry()
@@ -0,0 +1,183 @@
+import json
+import re
+from typing import Generic, Iterator, List, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_CODE_FENCE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+# Truncated output is cut back to earlier element boundaries at most this many times
+_MAX_CUTS = 50
+
+
+def _strip_code_fence(text: str) -> str:
+    match = _CODE_FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def _close(out: list, stack: list) -> str:
+    text = "".join(out).rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def repair_candidates(text: str) -> Iterator[str]:
+    """
+    Yields repaired versions of malformed LLM JSON output, most complete first.
+
+    Markdown code fences and any prose around the outermost object/array are
+    dropped, trailing commas removed and raw newlines/tabs inside strings
+    escaped. Truncated output (unterminated string, unclosed brackets) is
+    closed, then cut back element by element so the caller can take the
+    longest prefix that validates, e.g. a story without its unfinished last scene.
+    """
+    text = _strip_code_fence(text)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return
+
+    out, stack = [], []
+    # (output length, open brackets) just before each comma: the element boundaries to cut back to
+    cuts = []
+    in_string = escaped = False
+    for ch in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            elif ch == "\n":
+                ch = "\\n"
+            elif ch == "\r":
+                ch = "\\r"
+            elif ch == "\t":
+                ch = "\\t"
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                # Complete document: ignore whatever follows
+                yield "".join(out)
+                return
+            continue
+        elif ch == ",":
+            cuts.append((len(out), list(stack)))
+        out.append(ch)
+
+    # Truncated output: finish the open string, then close every open bracket
+    if escaped:
+        out.pop()
+    if in_string:
+        out.append('"')
+    yield _close(out, stack)
+    for length, open_brackets in reversed(cuts[-_MAX_CUTS:]):
+        yield _close(out[:length], open_brackets)
+
+
+def parse_json_model(response_model: Type[ModelT], text: str) -> Tuple[ModelT, bool]:
+    """
+    Parses `text` into `response_model`, repairing it locally when it is not valid as-is.
+    Returns the model and whether a repair was needed; raises ValueError if nothing validates.
+    """
+    try:
+        return response_model.model_validate_json(text), False
+    except ValidationError as e:
+        error = e
+
+    for candidate in repair_candidates(text):
+        try:
+            return response_model.model_validate(json.loads(candidate)), True
+        except (ValueError, ValidationError):
+            continue
+    raise ValueError(f"Invalid {response_model.__name__} JSON, repair failed: {error}")
+
+
+class StreamingArrayParser(Generic[ModelT]):
+    """
+    Incrementally parses streamed LLM JSON such as {"scenes": [{...}, {...}]}:
+    every object of the first array is validated as `item_model` and returned
+    by feed() as soon as its closing brace arrives. Items that don't validate
+    are repaired like parse_json_model() does, or skipped and counted in `failed`.
+    """
+
+    def __init__(self, item_model: Type[ModelT]):
+        self.item_model = item_model
+        self.items: List[ModelT] = []
+        self.repaired = 0
+        self.failed = 0
+        self.complete = False  # the array was closed
+        self._chunks: List[str] = []
+        self._item: List[str] = None
+        self._depth = 0
+        self._array_depth = None
+        self._in_string = self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[ModelT]:
+        """Consumes the next chunk of output; returns the items completed by it."""
+        self._chunks.append(chunk)
+        completed = []
+        if self.complete:
+            return completed
+        for ch in chunk:
+            if self._item is not None:
+                self._item.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._item is None and self._depth == self._array_depth:
+                    self._item = [ch]
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._item is not None and self._depth == self._array_depth:
+                    item = self._parse_item("".join(self._item))
+                    self._item = None
+                    if item is not None:
+                        self.items.append(item)
+                        completed.append(item)
+                elif self._array_depth is not None and self._depth < self._array_depth:
+                    self.complete = True
+                    break
+        return completed
+
+    def _parse_item(self, text: str):
+        try:
+            item, repaired = parse_json_model(self.item_model, text)
+        except ValueError:
+            self.failed += 1
+            return None
+        self.repaired += repaired
+        return item
@@ -0,0 +1,56 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from app.ml.llm_metrics import OPERATION_METADATA_KEY, current_metrics_targets
+
+
+def _content_length(content: Any) -> int:
+    return len(content) if isinstance(content, str) else len(str(content))
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """LangChain callback handler recording every chat model call into LLMMetrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, name: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        prompt_chars = sum(_content_length(message.content) for batch in messages for message in batch)
+        operation = (metadata or {}).get(OPERATION_METADATA_KEY) or name or "llm"
+        with self._lock:
+            self._runs[run_id] = (operation, prompt_chars, time.monotonic(), current_metrics_targets())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        operation, prompt_chars, started, targets = run
+
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+
+        latency = time.monotonic() - started
+        for metrics in targets:
+            metrics.record_call(operation, prompt_chars, latency, input_tokens, output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        operation, prompt_chars, started, targets = run
+        latency = time.monotonic() - started
+        for metrics in targets:
+            metrics.record_call(operation, prompt_chars, latency, error=f"{type(error).__name__}: {error}")
+
+
+llm_metrics_handler = LLMMetricsHandler()
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+class LLMMetrics:
+    """
+    Thread-safe per-operation statistics of LLM calls: call and error counts,
+    input/output tokens, prompt characters, latency and output parse results
+    (parsed as-is, parsed after local JSON repair, failed, re-invoked).
+    Operations are the `run_name` passed with each call (e.g. "summary.refine").
+    """
+
+    def __init__(self, recent_calls: int = 0):
+        self._lock = threading.Lock()
+        self._operations: Dict[str, dict] = {}
+        self._recent = deque(maxlen=recent_calls) if recent_calls else None
+
+    def _operation(self, name: str) -> dict:
+        return self._operations.setdefault(name, {
+            "calls": 0,
+            "errors": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "prompt_chars": 0,
+            "max_prompt_chars": 0,
+            "latency_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+            "parse_success": 0,
+            "parse_failure": 0,
+            "parse_repaired": 0,
+            "parse_retries": 0,
+        })
+
+    def record_call(self, operation: str, prompt_chars: int, latency: float, input_tokens: int = 0, output_tokens: int = 0, error: Optional[str] = None):
+        with self._lock:
+            stats = self._operation(operation)
+            stats["calls"] += 1
+            stats["errors"] += error is not None
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["prompt_chars"] += prompt_chars
+            stats["max_prompt_chars"] = max(stats["max_prompt_chars"], prompt_chars)
+            stats["latency_seconds"] += latency
+            stats["max_latency_seconds"] = max(stats["max_latency_seconds"], latency)
+            if self._recent is not None:
+                self._recent.append({
+                    "operation": operation,
+                    "prompt_chars": prompt_chars,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "latency_seconds": round(latency, 3),
+                    "error": error,
+                    "timestamp": time.time(),
+                })
+
+    def record_parse(self, operation: str, success: bool, repaired: bool = False):
+        with self._lock:
+            stats = self._operation(operation)
+            stats["parse_success" if success else "parse_failure"] += 1
+            stats["parse_repaired"] += success and repaired
+
+    def record_retry(self, operation: str):
+        """Counts an LLM call repeated because its output could not be parsed nor repaired."""
+        with self._lock:
+            self._operation(operation)["parse_retries"] += 1
+
+    def snapshot(self) -> dict:
+        """Returns the statistics per operation, overall totals and (if kept) the most recent calls."""
+        with self._lock:
+            operations = {name: dict(stats) for name, stats in self._operations.items()}
+            recent = list(self._recent) if self._recent is not None else None
+
+        totals = {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0, "prompt_chars": 0, "latency_seconds": 0.0}
+        for stats in operations.values():
+            for key in totals:
+                totals[key] += stats[key]
+            calls = stats["calls"] or 1
+            stats["avg_prompt_chars"] = round(stats["prompt_chars"] / calls, 1)
+            stats["avg_latency_seconds"] = round(stats["latency_seconds"] / calls, 3)
+            stats["latency_seconds"] = round(stats["latency_seconds"], 3)
+            stats["max_latency_seconds"] = round(stats["max_latency_seconds"], 3)
+        totals["latency_seconds"] = round(totals["latency_seconds"], 3)
+
+        snapshot = {"operations": operations, "totals": totals}
+        if recent is not None:
+            snapshot["recent_calls"] = recent
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            if self._recent is not None:
+                self._recent.clear()
+
+
+# Run metadata key naming the operation of an LLM call; unlike run_name it also
+# reaches the chat model when it runs inside a chain (e.g. with_structured_output)
+OPERATION_METADATA_KEY = "llm_operation"
+
+# Process-wide metrics, exposed by the metrics endpoint
+llm_metrics = LLMMetrics(recent_calls=200)
+
+# Metrics of the job running in the current context (see collect_llm_metrics)
+_job_metrics: ContextVar[Optional[LLMMetrics]] = ContextVar("job_llm_metrics", default=None)
+
+
+@contextmanager
+def collect_llm_metrics():
+    """
+    Additionally records every LLM call made in this context (e.g. one pipeline
+    job) into a fresh LLMMetrics, which is yielded.
+    LangChain's batch() copies the context into its worker threads, so batched calls are included.
+    """
+    metrics = LLMMetrics()
+    token = _job_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _job_metrics.reset(token)
+
+
+def current_metrics_targets() -> List[LLMMetrics]:
+    """The process-wide metrics plus, inside collect_llm_metrics(), the current job's metrics."""
+    job_metrics = _job_metrics.get()
+    return [llm_metrics, job_metrics] if job_metrics else [llm_metrics]
+
+
+def llm_run_config(operation: str, **config) -> dict:
+    """LangChain run config recording the call(s) under `operation`."""
+    return {**config, "run_name": operation, "metadata": {OPERATION_METADATA_KEY: operation}}
+
+
+def record_parse(operation: str, success: bool, repaired: bool = False):
+    for metrics in current_metrics_targets():
+        metrics.record_parse(operation, success, repaired)
+
+
+def record_retry(operation: str):
+    for metrics in current_metrics_targets():
+        metrics.record_retry(operation)
@@ -1,47 +1,262 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from moviepy import concatenate_videoclips,CompositeAudioClip,AudioFileClip,VideoFileClip
-from langchain_google_genai import ChatGoogleGenerativeAI 
 from app.core.config import settings
-from langchain_core.output_parsers import PydanticOutputParser
-from typing import List
-from openai import OpenAI
-import requests
+from typing import Iterator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+import functools
 import os
-from gtts import gTTS
-import time
-from google import genai
-from google.genai import types
+import threading
+import unicodedata
 videoId = "9ofL45Mrzj0"
 import uuid 
-from app.schemas.ml_process_response import ImageGeneratorResponse,StoryGeneratorResponse,VideoWithVoiceoverResponse,VideoGeneratorResponse,StoryListResponse
-from app.utils.prompt_template import image_generator_prompt , summary_prompt
+from app.schemas.ml_process_response import ImageGeneratorResponse,StoryGeneratorResponse,VideoWithVoiceoverResponse,VideoGeneratorResponse,StoryListResponse,RegeneratedScenesResponse,FailedSceneRegeneration
+from app.utils.prompt_template import image_generator_prompt , summary_prompt, chunk_summary_prompt, combine_summaries_prompt, regenerate_scene_prompt
 from app.schemas.api_response import TranscriptUploadResponse
+from app.ml.artifact_cache import ArtifactCache
+from app.ml.progress import report_progress
+from app.ml.video_assembler import assemble_final_video
+from app.ml.voiceover_engines import get_voiceover_engine
+from app.ml.clients import clients
+from app.ml.pipeline_checkpoint import PipelineCheckpoint
+from app.ml.llm_metrics import llm_run_config, record_parse, record_retry
+from app.ml.json_repair import StreamingArrayParser, parse_json_model
+from app.ml.veo_scheduler import VEO_MODEL
 
 
 
 OUTPUT_DIR = "nebius_scene_images"
-# Ensure the output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+NEBIUS_IMAGE_MODEL = "black-forest-labs/flux-dev"
+# Extra generation parameters sent to Nebius; part of the image cache key
+NEBIUS_IMAGE_PARAMS = {}
+# Clip settings of every Veo generation
+VEO_CLIP_CONFIG = {
+    "duration_seconds": 4,  # typical short cinematic
+    "aspect_ratio": "16:9",
+}
+
+SUMMARY_MODE_REFINE = "refine"
+SUMMARY_MODE_MAP_REDUCE = "map_reduce"
+SUMMARY_MODEL = "gemini-2.5-flash"
+# Bump when summary prompts or chunking change so cached summaries are regenerated
+SUMMARIZER_VERSION = "1"
+
+STORY_MODEL = "gemini-2.5-flash"
+STORY_STREAM_OPERATION = "story.stream"
+# Sampling temperature per task; every (model, temperature) pair is one shared client
+STORY_TEMPERATURE = 1.2
+SCENE_REGENERATION_TEMPERATURE = 1.3  # Slightly higher for variation
+SCENE_EDIT_TEMPERATURE = 0.9
+IMAGE_PROMPT_TEMPERATURE = 0.8
+LLM_PROFILES = [
+    (SUMMARY_MODEL, None),
+    (STORY_MODEL, STORY_TEMPERATURE),
+    (STORY_MODEL, SCENE_REGENERATION_TEMPERATURE),
+    (STORY_MODEL, SCENE_EDIT_TEMPERATURE),
+    (STORY_MODEL, IMAGE_PROMPT_TEMPERATURE),
+]
+
+# Provider SDKs and clients are created on first use (see app.ml.clients) to keep API startup fast
+image_cache = ArtifactCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES, extension=".png")
+# No extension: entries from different voiceover engines (mp3, wav) share the cache
+audio_cache = ArtifactCache(settings.AUDIO_CACHE_DIR, settings.AUDIO_CACHE_MAX_BYTES)
+
+
+
+@functools.lru_cache(maxsize=None)
+def _output_parser(response_model):
+    """Shared PydanticOutputParser per response model."""
+    from langchain_core.output_parsers import PydanticOutputParser
+
+    return PydanticOutputParser(pydantic_object=response_model)
+
+
+def _structured_llm(model: str, temperature: Optional[float], response_model):
+    """
+    Shared chat model constrained to the JSON schema of `response_model`
+    (Gemini JSON mode). Results are {"raw": message, "parsed": model or None, "parsing_error": ...}.
+    """
+    return clients.chat(model, temperature).with_structured_output(response_model, method="json_schema", include_raw=True)
+
+
+def _json_mode_llm(model: str, temperature: Optional[float], response_model):
+    """
+    The chat model of _structured_llm() without its output parser, which
+    only parses once the whole response is in; used to stream the raw JSON.
+    """
+    return clients.chat(model, temperature).with_structured_output(response_model, method="json_schema").first
+
+
+def _parse_structured(result: dict, response_model, operation: str):
+    """
+    Returns the `response_model` of a structured-output result. When the
+    schema parse failed, the raw text is repaired locally (see json_repair)
+    instead of paying for another call. Raises ValueError if it can't be recovered.
+    """
+    if result["parsed"] is not None:
+        record_parse(operation, True)
+        return result["parsed"]
+    try:
+        parsed, _ = parse_json_model(response_model, result["raw"].text)
+    except ValueError:
+        record_parse(operation, False)
+        raise
+    record_parse(operation, True, repaired=True)
+    return parsed
+
+
+def _collect_structured(pending: List[int], outputs: list, results: list, response_model, operation: str) -> List[int]:
+    """
+    Stores the parsed outputs (or exceptions) of the `pending` prompts in `results`.
+    Returns the prompts whose output could not be parsed, which are worth sending again.
+    """
+    unparsed = []
+    for index, output in zip(pending, outputs):
+        if isinstance(output, Exception):
+            results[index] = output
+            continue
+        try:
+            results[index] = _parse_structured(output, response_model, operation)
+        except ValueError as e:
+            results[index] = e
+            unparsed.append(index)
+    return unparsed
+
+
+def _invoke_structured(llm, prompt: str, response_model, operation: str):
+    """
+    Invokes a structured-output `llm` and returns the parsed `response_model`.
+    Output that can't be parsed nor repaired is requested again, at most settings.LLM_PARSE_RETRIES times.
+    """
+    for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+        if attempt:
+            record_retry(operation)
+        result = llm.invoke(prompt, config=llm_run_config(operation))
+        try:
+            return _parse_structured(result, response_model, operation)
+        except ValueError as e:
+            error = e
+    raise error
 
-llm = ChatGoogleGenerativeAI(model='gemini-2.5-flash',google_api_key=settings.GOOGLE_API_KEY)
-client = genai.Client()
 
-pydanticParser = PydanticOutputParser(pydantic_object=StoryListResponse)
+def _batch_structured(llm, prompts: List[str], response_model, operation: str, max_concurrency: int) -> list:
+    """
+    batch() counterpart of _invoke_structured(): returns a parsed model or an
+    exception per prompt. Only the prompts whose output couldn't be parsed are sent again.
+    """
+    results = [None] * len(prompts)
+    pending = list(range(len(prompts)))
+    for attempt in range(settings.LLM_PARSE_RETRIES + 1):
+        if not pending:
+            break
+        if attempt:
+            for _ in pending:
+                record_retry(operation)
+        outputs = llm.batch([prompts[i] for i in pending], config=llm_run_config(operation, max_concurrency=max_concurrency), return_exceptions=True)
+        pending = _collect_structured(pending, outputs, results, response_model, operation)
+    return results
+
+
+def warm_llm_clients():
+    """Creates the shared chat clients for every LLM profile so requests don't pay for client setup."""
+    for model, temperature in LLM_PROFILES:
+        clients.chat(model, temperature)
+
 
 # ! Youtube Transcript and Summary Generator
-def transcript_generator(videoId:str):
+def _refine_summary(chunks: List[str]) -> str:
+    """
+    Sequential "refine" summarization: every chunk is sent together with the
+    summary built so far.
+    """
+    llm = clients.chat(SUMMARY_MODEL)
+    summary = ""
+    for doc in chunks:
+        prompt = summary_prompt(doc, summary)
+        summary = llm.invoke(prompt, config=llm_run_config("summary.refine"))
+    return summary.content
+
+
+def _map_reduce_summary(chunks: List[str], max_concurrency: int, fan_in: int) -> str:
+    """
+    Map-reduce summarization: chunks are summarized concurrently, then the partial
+    summaries are merged in a tree, `fan_in` at a time, until one summary is left.
+    """
+    if not chunks:
+        raise ValueError("Transcript is empty, nothing to summarize")
+    # Groups of one would never merge and the reduce loop would not end
+    fan_in = max(2, fan_in)
+    llm = clients.chat(SUMMARY_MODEL)
+    prompts = [chunk_summary_prompt(doc, i, len(chunks)) for i, doc in enumerate(chunks, 1)]
+    map_config = llm_run_config("summary.map", max_concurrency=max_concurrency)
+    summaries = [result.content for result in llm.batch(prompts, config=map_config)]
+    print(f"Summarized {len(chunks)} chunks concurrently")
+
+    reduce_config = llm_run_config("summary.reduce", max_concurrency=max_concurrency)
+    level = 1
+    while len(summaries) > 1:
+        groups = [summaries[i:i + fan_in] for i in range(0, len(summaries), fan_in)]
+        # A trailing group of one has nothing to merge and is carried up unchanged
+        merge_groups = [group for group in groups if len(group) > 1]
+        merged = iter(result.content for result in llm.batch([combine_summaries_prompt(group) for group in merge_groups], config=reduce_config))
+        summaries = [next(merged) if len(group) > 1 else group[0] for group in groups]
+        print(f"Reduce level {level}: merged into {len(summaries)} summaries")
+        level += 1
+
+    return summaries[0]
+
+
+def fetch_transcript(videoId: str) -> str:
+    """
+    Fetches the English transcript of a YouTube video as one string.
+    Raises TranscriptsDisabled when the video has no transcript.
+    """
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    api = YouTubeTranscriptApi()
+    transcriptList = api.fetch(video_id=videoId, languages=['en'])
+    return " ".join(chunk.text for chunk in transcriptList.snippets)
+
+
+def summarize_transcript(transcript: str, summary_mode: str = SUMMARY_MODE_REFINE) -> str:
+    """
+    Summarizes a transcript with the selected strategy.
+
+    Args:
+        transcript: Full transcript text
+        summary_mode: "refine" (sequential, each step sees the running summary) or
+            "map_reduce" (chunks summarized concurrently, then merged in a tree)
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=200)
+    chunks = splitter.split_text(transcript)
+    if not chunks:
+        raise ValueError("Transcript is empty, nothing to summarize")
+    if summary_mode == SUMMARY_MODE_MAP_REDUCE:
+        return _map_reduce_summary(
+            chunks,
+            max_concurrency=settings.SUMMARY_MAX_CONCURRENCY,
+            fan_in=settings.SUMMARY_REDUCE_FAN_IN,
+        )
+    return _refine_summary(chunks)
+
+
+def transcript_generator(videoId:str, summary_mode: str = SUMMARY_MODE_REFINE):
+    """
+    Fetches the English transcript of a YouTube video and summarizes it.
+
+    Args:
+        videoId: YouTube video ID
+        summary_mode: "refine" or "map_reduce", see summarize_transcript()
+
+    Returns:
+        The summary text, or a TranscriptUploadResponse describing the failure
+    """
+    from youtube_transcript_api import TranscriptsDisabled
+
     try:
-        summary=""
-        api = YouTubeTranscriptApi()
-        transcriptList = api.fetch(video_id=videoId, languages=['en'])
-        transcript = " ".join(chunk.text for chunk in transcriptList.snippets)
-        splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=200)
-        chunks = splitter.split_text(transcript)
-        for doc in chunks:
-            prompt = summary_prompt(doc,summary)
-            summary = llm.invoke(prompt)
-        return summary.content
+        transcript = fetch_transcript(videoId)
+        if not transcript.strip():
+            return TranscriptUploadResponse(message="NO CONTENT FOUND OR NO TRANSCRIPT FOUND",status=404,success=False)
+        return summarize_transcript(transcript, summary_mode)
     except TranscriptsDisabled:
          return TranscriptUploadResponse(message="NO CONTENT FOUND OR NO TRANSCRIPT FOUND",status=404,success=False)
     except Exception:
@@ -52,97 +267,181 @@ def transcript_generator(videoId:str):
 # ! Video Script Generator
 def story_generator(summary:str):
     try:
-        llm = ChatGoogleGenerativeAI(model='gemini-2.5-flash',google_api_key=settings.GOOGLE_API_KEY , temperature=1.2) 
-        prompt = image_generator_prompt(summary,pydanticParser)
+        llm = _structured_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        prompt = image_generator_prompt(summary,_output_parser(StoryListResponse))
         print("Prompt Generated")
         formatted_prompt = prompt.format(
         video_summary=summary,
         )
-        result = llm.invoke(formatted_prompt)
-        parsed_output = pydanticParser.parse(result.content)
+        parsed_output = _invoke_structured(llm, formatted_prompt, StoryListResponse, "story.generate")
         return parsed_output
     except Exception as e:
         print(f"Error in story generator: {e}")
         raise Exception(f"Failed to generate story: {str(e)}")    
 
 
+def _story_prompt(summary: str) -> str:
+    return image_generator_prompt(summary, _output_parser(StoryListResponse)).format(video_summary=summary)
+
+
+def _finish_story_stream(parser: StreamingArrayParser) -> bool:
+    """Records the parse result of a streamed story; returns whether it has to be generated again."""
+    if parser.items:
+        record_parse(STORY_STREAM_OPERATION, True, repaired=bool(parser.repaired or parser.failed or not parser.complete))
+        return False
+    record_parse(STORY_STREAM_OPERATION, False)
+    record_retry(STORY_STREAM_OPERATION)
+    return True
+
+
+def stream_story_scenes(summary: str) -> Iterator[StoryGeneratorResponse]:
+    """
+    Streaming story_generator(): yields every scene as soon as its JSON object
+    is complete in Gemini's token stream, so work on the first scenes can start
+    while the last ones are still being written.
+
+    Scenes that are malformed are repaired or skipped; if the stream produced
+    no scene at all, the story is generated again with story_generator().
+    """
+    try:
+        llm = _json_mode_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        parser = StreamingArrayParser(StoryGeneratorResponse)
+        for chunk in llm.stream(_story_prompt(summary), config=llm_run_config(STORY_STREAM_OPERATION)):
+            yield from parser.feed(chunk.text)
+    except Exception as e:
+        print(f"Error in story generator: {e}")
+        raise Exception(f"Failed to generate story: {str(e)}")
+
+    if _finish_story_stream(parser):
+        print("Streamed story could not be parsed, generating it again")
+        yield from story_generator(summary).scenes
+
+
 
 # ! Image  Generator
-def image_generator(scenes: List["StoryGeneratorResponse"], output_dir: str) -> List["ImageGeneratorResponse"]:
+def _image_key(prompt_text: str) -> str:
+    """Hash of everything that determines a generated image (cache and checkpoint key)."""
+    return ArtifactCache.make_key(model=NEBIUS_IMAGE_MODEL, prompt=prompt_text, params=NEBIUS_IMAGE_PARAMS)
+
+
+def _fetch_image(client, prompt_text: str, image_filename: str, bypass_cache: bool = False) -> bool:
     """
-    Generates images via the Nebius AI API, saves them locally, 
-    and returns a list of ImageGeneratorResponse objects with the local path.
+    Generates an image for `prompt_text` with Nebius and saves it to `image_filename`.
+    Identical requests are served from the image cache unless `bypass_cache` is set.
+
+    Returns:
+        True if the image came from the cache
     """
-    generated_scenes_with_images = []
-    failed_scenes = []
+    cache_key = _image_key(prompt_text)
+    if not bypass_cache and image_cache.get(cache_key, image_filename):
+        return True
 
-    os.makedirs(output_dir, exist_ok=True)
+    response = client.images.generate(
+        model=NEBIUS_IMAGE_MODEL,
+        prompt=prompt_text,
+        **NEBIUS_IMAGE_PARAMS,
+    )
 
-    try:
-        client = OpenAI(
-            base_url="https://api.studio.nebius.com/v1/",
-            api_key=settings.NEBIUS_API_KEYS
-        )
-    except NameError:
-        error_msg = "ERROR: 'settings' or 'settings.NEBIUS_API_KEYS' is not defined."
-        print(error_msg)
-        raise Exception(error_msg)
+    image_url = getattr(response.data[0], "url", None)
+    if not image_url:
+        raise ValueError("No image URL returned by Nebius API.")
 
-    asset_counter = 1
+    with clients.http_session().get(image_url, stream=True, timeout=clients.http_timeout()) as image_response:
+        image_response.raise_for_status()
 
-    for scene_data in scenes:
-        
-        if not scene_data.prompts or not scene_data.prompts[0]:
-            print(f"Skipping scene '{scene_data.scene}': No valid prompt provided.")
-            failed_scenes.append(scene_data.scene)
-            continue
+        with open(image_filename, 'wb') as file:
+            for chunk in image_response.iter_content(chunk_size=8192):
+                file.write(chunk)
 
-        prompt_text = scene_data.prompts[0]
-        scene_title_safe = scene_data.scene.replace(' ', '_').replace(':', '')
+    image_cache.put(cache_key, image_filename)
+    return False
 
-        
-        scene_dict = scene_data.model_dump()
-        scene_dict["image"] = None
-        scene_with_image = ImageGeneratorResponse(**scene_dict)
 
-        print(f"[{asset_counter}/{len(scenes)}] Generating image for: {scene_data.scene}...")
+def _generate_scene_image(client, scene_data: "StoryGeneratorResponse", asset_counter: int, total: int, output_dir: str, bypass_cache: bool = False):
+    """
+    Generates and downloads the image for a single scene.
+    Returns the ImageGeneratorResponse and whether the generation failed.
+    """
+    prompt_text = scene_data.prompts[0]
+    scene_title_safe = scene_data.scene.replace(' ', '_').replace(':', '')
 
-        try:
-            
-            response = client.images.generate(
-                model="black-forest-labs/flux-dev",
-                prompt=prompt_text,
-            )
+    scene_dict = scene_data.model_dump()
+    scene_dict["image"] = None
+    scene_with_image = ImageGeneratorResponse(**scene_dict)
 
-            
-            image_url = getattr(response.data[0], "url", None)
-            if not image_url:
-                raise ValueError("No image URL returned by Nebius API.")
+    print(f"[{asset_counter}/{total}] Generating image for: {scene_data.scene}...")
 
-            print(f"  -> API call successful. Downloading image...")
+    try:
+        image_filename = os.path.join(output_dir, f"{asset_counter}_{scene_title_safe}.png")
+        from_cache = _fetch_image(client, prompt_text, image_filename, bypass_cache=bypass_cache)
 
-            
-            image_filename = os.path.join(output_dir, f"{asset_counter}_{scene_title_safe}.png")
-            image_response = requests.get(image_url, stream=True)
-            image_response.raise_for_status()
+        scene_with_image.image = image_filename
+        print(f"  -> Image {'reused from cache' if from_cache else 'saved'}: {image_filename}")
+        return scene_with_image, False
 
-            with open(image_filename, 'wb') as file:
-                for chunk in image_response.iter_content(chunk_size=8192):
-                    file.write(chunk)
+    except Exception as e:
+        error_msg = f"ERROR generating/saving image for '{scene_data.scene}': {e}"
+        print(f"  -> {error_msg}")
+        return scene_with_image, True
 
-            
-            scene_with_image.image = image_filename
-            print(f"  -> Image saved: {image_filename}")
 
-        except Exception as e:
-            error_msg = f"ERROR generating/saving image for '{scene_data.scene}': {e}"
-            print(f"  -> {error_msg}")
-            failed_scenes.append(scene_data.scene)
+def image_generator(scenes: List["StoryGeneratorResponse"], output_dir: str, max_concurrency: Optional[int] = None, bypass_cache: bool = False, progress=None) -> List["ImageGeneratorResponse"]:
+    """
+    Generates images via the Nebius AI API, saves them locally, 
+    and returns a list of ImageGeneratorResponse objects with the local path.
+
+    All scenes are submitted at once and generated concurrently (at most
+    `max_concurrency` in flight, defaulting to settings.NEBIUS_MAX_CONCURRENCY).
+    The returned list keeps the original scene order. Prompts that were generated
+    before are served from the image cache unless `bypass_cache` is set.
+    `progress` is an optional callback receiving per-scene progress events.
+    """
+    generated_scenes_with_images = []
+    failed_scenes = []
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    client = clients.nebius()
 
-        generated_scenes_with_images.append(scene_with_image)
-        asset_counter += 1
+    report_progress(progress, "images", "started", percent=0)
+
+    # Number the scenes that have a usable prompt; these numbers are used in the filenames
+    jobs = []
+    for scene_index, scene_data in enumerate(scenes):
+        if not scene_data.prompts or not scene_data.prompts[0]:
+            print(f"Skipping scene '{scene_data.scene}': No valid prompt provided.")
+            failed_scenes.append(scene_data.scene)
+            report_progress(progress, "images", "failed", scene_index=scene_index, scene=scene_data.scene, message="No valid prompt provided")
+            continue
+        jobs.append((len(jobs) + 1, scene_index, scene_data))
+
+    if jobs:
+        max_workers = max(1, min(max_concurrency or settings.NEBIUS_MAX_CONCURRENCY, len(jobs)))
+        print(f"Generating {len(jobs)} images with up to {max_workers} requests in flight...")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_generate_scene_image, client, scene_data, asset_counter, len(scenes), output_dir, bypass_cache)
+                for asset_counter, _, scene_data in jobs
+            ]
+            scene_by_future = {future: (scene_index, scene_data) for (_, scene_index, scene_data), future in zip(jobs, futures)}
+            for done_count, future in enumerate(as_completed(futures), 1):
+                scene_index, scene_data = scene_by_future[future]
+                _, failed = future.result()
+                report_progress(
+                    progress, "images", "failed" if failed else "progress",
+                    scene_index=scene_index, scene=scene_data.scene, percent=100 * done_count / len(futures),
+                )
+
+            # Collect in submission order so the output matches the scene order
+            for (_, _, scene_data), future in zip(jobs, futures):
+                scene_with_image, failed = future.result()
+                if failed:
+                    failed_scenes.append(scene_data.scene)
+                generated_scenes_with_images.append(scene_with_image)
 
     print("\n✅ Image generation phase complete.")
+    report_progress(progress, "images", "completed", percent=100, message=f"{len(failed_scenes)} failed" if failed_scenes else None)
     
     if len(failed_scenes) == len(scenes):
         raise Exception(f"All image generations failed. Please check API keys and network connection.")
@@ -153,148 +452,252 @@ def image_generator(scenes: List["StoryGeneratorResponse"], output_dir: str) ->
 
 
 # !Video Generator
-def video_generator(images: List["ImageGeneratorResponse"], output_dir: str = "generated_videos") -> List["VideoGeneratorResponse"]:
+def _prepare_veo_request(image_path: Optional[str]):
     """
-    Generates short video clips for each scene using the Veo 3.1 model.
-    Optionally uses a local image reference (from image generation).
+    Uploads the reference image (if any) and builds the Veo generation config.
+    Returns the config and the uploaded file (None when no reference was used).
+    """
+    uploaded_file = None
+    if image_path and os.path.exists(image_path):
+        print(f"\n📤 Uploading reference image: {image_path}")
+        uploaded_file = clients.genai().files.upload(file=image_path)
+        print(f"✅ Uploaded reference: {uploaded_file.name}")
 
-    Args:
-        images: List of ImageGeneratorResponse objects containing prompts and image paths.
-        output_dir: Directory where generated video clips will be saved.
+    config_kwargs = dict(VEO_CLIP_CONFIG)
+    if uploaded_file:
+        config_kwargs["reference_images"] = [uploaded_file]
+    from google.genai import types
 
-    Returns:
-        A list of VideoGeneratorResponse objects with video paths populated.
+    return types.GenerateVideosConfig(**config_kwargs), uploaded_file
+
+
+def _delete_upload(uploaded_file):
+    """Returns a callback that deletes a temporary reference upload."""
+    def cleanup():
+        if uploaded_file:
+            clients.genai().files.delete(name=uploaded_file.name)
+            print(f" Deleted temporary upload: {uploaded_file.name}")
+    return cleanup
+
+
+def _submit_veo_generation(image: "ImageGeneratorResponse", output_path: str):
+    """
+    Submits a Veo generation for one scene to the shared operation scheduler.
+    Returns a Future resolved with the saved video path.
+    """
+    config, uploaded_file = _prepare_veo_request(image.image)
+    print(f"Generating video for scene: {image.scene}")
+    return clients.veo_scheduler().submit(
+        prompt=image.visual_cues,
+        config=config,
+        output_path=output_path,
+        label=image.scene,
+        on_finish=_delete_upload(uploaded_file),
+    )
+
+
+def _video_scene(image: "ImageGeneratorResponse") -> "VideoGeneratorResponse":
+    """The scene of `image` without a clip yet."""
+    return VideoGeneratorResponse(
+        scene=image.scene,
+        narration=image.narration,
+        visual_cues=image.visual_cues,
+        prompts=image.prompts,
+        image=image.image,
+        video_path=None,
+    )
+
+
+def _report_when_done(future: Future, stage_progress: "_StageProgress", index: int, scene: str) -> Future:
+    """Returns a Future resolved like `future`, once the scene has been reported to `stage_progress`."""
+    reported = Future()
+
+    def on_done(done: Future):
+        error = done.exception()
+        stage_progress.scene_done(index, scene, error)
+        if error:
+            reported.set_exception(error)
+        else:
+            reported.set_result(done.result())
+
+    future.add_done_callback(on_done)
+    return reported
+
+
+def _submit_scene_videos(images: List["ImageGeneratorResponse"], output_dir: str, progress=None):
+    """
+    Submits the clip of every scene to the shared VeoOperationScheduler and
+    reports each scene to `progress` as its clip finishes.
+    Returns the scenes and one Future per scene (failed if its submission failed).
     """
     os.makedirs(output_dir, exist_ok=True)
+    stage_progress = _StageProgress(progress, "videos", len(images))
     videos = []
-    failed_videos = []
-
+    futures = []
     for i, image in enumerate(images, 1):
-        uploaded_file = None
         safe_title = image.scene.replace(" ", "_").replace(":", "")
         unique_id = str(uuid.uuid4())[:8]
         output_path = os.path.join(output_dir, f"{i}_{safe_title}_{unique_id}.mp4")
-
-        # Prepare VideoGeneratorResponse base object
-        video_scene = VideoGeneratorResponse(
-            scene=image.scene,
-            narration=image.narration,
-            visual_cues=image.visual_cues,
-            prompts=image.prompts,
-            image=image.image,
-            video_path=None,
-        )
+        videos.append(_video_scene(image))
 
         try:
-            #  Upload reference image if available ---
-            if image.image and os.path.exists(image.image):
-                print(f"\n📤 Uploading reference image: {image.image}")
-                uploaded_file = client.files.upload(file=image.image)
-                print(f"✅ Uploaded reference: {uploaded_file.name}")
-
-            #  Configure generation parameters ---
-            config_kwargs = {
-                "duration_seconds": 4,  # typical short cinematic
-                "aspect_ratio": "16:9",
-            }
-            if uploaded_file:
-                config_kwargs["reference_images"] = [uploaded_file]
-            config = types.GenerateVideosConfig(**config_kwargs)
-
-            #  Generate video ---
-            print(f"Generating video for scene: {image.scene}")
-            operation = client.models.generate_videos(
-                model="veo-3.1-generate-preview",
-                prompt=image.visual_cues,
-                config=config,
-            )
-
-            #  Poll until video generation completes ---
-            print("⏳ Waiting for video generation (may take a few minutes)...")
-            while not operation.done:
-                print(".", end="", flush=True)
-                time.sleep(10)
-                operation = client.operations.get(operation.name)
-
-            #  Download the generated video ---
-            if getattr(operation, "response", None) and getattr(operation.response, "generated_videos", None):
-                generated_video = operation.response.generated_videos[0]
-                client.files.download(file=generated_video.video, output_path=output_path)
-                video_scene.video_path = output_path
-                print(f"\n Video generated and saved: {output_path}")
-            else:
-                error_detail = getattr(operation, 'error', 'No details available')
-                error_msg = f"Video generation failed for scene: {image.scene}"
-                print(f"\n {error_msg}")
-                print(f"Error details: {error_detail}")
-                failed_videos.append(image.scene)
-
+            future = _submit_veo_generation(image, output_path)
         except Exception as e:
-            error_msg = f"Error generating video for {image.scene}: {e}"
-            print(f"\n {error_msg}")
-            failed_videos.append(image.scene)
+            future = Future()
+            future.set_exception(e)
+        futures.append(_report_when_done(future, stage_progress, i - 1, image.scene))
+    return videos, futures
 
-        finally:
-            # --- Clean up uploaded file ---
-            if uploaded_file:
-                try:
-                    client.files.delete(name=uploaded_file.name)
-                    print(f" Deleted temporary upload: {uploaded_file.name}")
-                except Exception as cleanup_err:
-                    print(f" Cleanup failed: {cleanup_err}")
 
-        videos.append(video_scene)
+def _collect_scene_videos(videos: List["VideoGeneratorResponse"], futures: List[Future]) -> List["VideoGeneratorResponse"]:
+    """Fills in the clip paths from the finished `futures`; raises if every clip failed."""
+    failed_videos = []
+    for video_scene, future in zip(videos, futures):
+        error = future.exception()
+        if error:
+            print(f"\n Error generating video for {video_scene.scene}: {error}")
+            failed_videos.append(video_scene.scene)
+        else:
+            video_scene.video_path = future.result()
 
     print("\n All videos processed.")
-    
+
     # Raise exception if too many videos failed
-    if len(failed_videos) == len(images):
+    if len(failed_videos) == len(videos):
         raise Exception(f"All video generations failed. Please check API keys and service availability.")
     elif len(failed_videos) > 0:
         print(f" Warning: {len(failed_videos)} videos failed to generate: {', '.join(failed_videos)}")
-    
+
     return videos
 
 
+def video_generator(images: List["ImageGeneratorResponse"], output_dir: str = "generated_videos", progress=None) -> List["VideoGeneratorResponse"]:
+    """
+    Generates short video clips for each scene using the Veo 3.1 model.
+    Optionally uses a local image reference (from image generation).
+
+    Every scene's operation is submitted up front and tracked by the shared
+    VeoOperationScheduler, so clips are generated in parallel.
+
+    Args:
+        images: List of ImageGeneratorResponse objects containing prompts and image paths.
+        output_dir: Directory where generated video clips will be saved.
+        progress: Optional callback receiving per-scene progress events.
+
+    Returns:
+        A list of VideoGeneratorResponse objects with video paths populated.
+    """
+    videos, futures = _submit_scene_videos(images, output_dir, progress)
+    print("⏳ Waiting for video generation (may take a few minutes)...")
+    wait(futures)
+    return _collect_scene_videos(videos, futures)
+
+
 # ! Generate Voice
-def generate_voiceover(scenes_with_images: List["VideoGeneratorResponse"], output_dir="voice_overs") -> List["VideoWithVoiceoverResponse"]:
+def _normalize_narration(text: str) -> str:
+    """Normalizes narration so whitespace-only edits still hit the audio cache."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _voiceover_key(narration: str) -> str:
+    """Hash of the narration and voiceover engine settings (cache and checkpoint key)."""
+    engine = get_voiceover_engine()
+    return ArtifactCache.make_key(engine=engine.name, text=_normalize_narration(narration), **engine.cache_parts())
+
+
+def _synthesize_voiceover(narration: str, tts_path: str, bypass_cache: bool = False) -> bool:
+    """
+    Synthesizes `narration` with the configured voiceover engine into `tts_path`.
+    Narrations that were synthesized before with the same engine and voice
+    settings are copied from the audio cache unless `bypass_cache` is set.
+
+    Returns:
+        True if the audio came from the cache
+    """
+    engine = get_voiceover_engine()
+    cache_key = _voiceover_key(narration)
+    if not bypass_cache and audio_cache.get(cache_key, tts_path):
+        return True
+
+    engine.synthesize(narration, tts_path)
+    audio_cache.put(cache_key, tts_path)
+    return False
+
+
+def _generate_scene_voiceover(scene: "VideoGeneratorResponse", index: int, total: int, output_dir: str):
+    """
+    Generates the voiceover for a single scene.
+    Returns the VideoWithVoiceoverResponse and the error (None on success).
+    """
+    # Create new response object with voiceover field
+    scene_dict = scene.model_dump()
+    scene_dict["voiceover"] = None
+    scene_with_voiceover = VideoWithVoiceoverResponse(**scene_dict)
+    
+    try:
+        tts_path = os.path.join(output_dir, f"{scene.scene.replace(' ', '_').replace(':', '')}{get_voiceover_engine().extension}")
+        print(f"[{index+1}/{total}] Generating voiceover for scene: {scene.scene}")
+        from_cache = _synthesize_voiceover(scene.narration, tts_path)
+        scene_with_voiceover.voiceover = tts_path
+        print(f"  -> Voiceover {'reused from cache' if from_cache else 'saved'}: {tts_path}")
+        return scene_with_voiceover, None
+    except Exception as e:
+        error_msg = f"Failed to generate voiceover for {scene.scene}: {e}"
+        print(f"  ->  {error_msg}")
+        return scene_with_voiceover, e
+
+
+def generate_voiceover(scenes_with_images: List["VideoGeneratorResponse"], output_dir="voice_overs", progress=None, max_concurrency: Optional[int] = None) -> List["VideoWithVoiceoverResponse"]:
     """
-    Generates free voiceover using Google Text-to-Speech (gTTS) for all scenes.
+    Generates voiceovers for all scenes with the configured voiceover engine
+    (settings.VOICEOVER_ENGINE: gTTS or the offline Piper backend).
     Returns list of scenes with voiceover paths added.
+
+    Scenes are synthesized concurrently (at most `max_concurrency`, defaulting to
+    settings.TTS_MAX_CONCURRENCY) and unchanged narrations are served from the audio cache.
+    `progress` is an optional callback receiving per-scene progress events.
+    Raises ValueError up front when the voiceover engine is misconfigured.
     """
+    engine = get_voiceover_engine()
     os.makedirs(output_dir, exist_ok=True)
     
     scenes_with_voiceovers = []
     failed_voiceovers = []
     
     print("\n Starting Voiceover Generation Phase ---")
+    report_progress(progress, "voiceovers", "started", percent=0)
     
-    for i, scene in enumerate(scenes_with_images):
-        tts_path = os.path.join(output_dir, f"{scene.scene.replace(' ', '_').replace(':', '')}.mp3")
-        
-        # Create new response object with voiceover field
-        scene_dict = scene.model_dump()
-        scene_dict["voiceover"] = None
-        scene_with_voiceover = VideoWithVoiceoverResponse(**scene_dict)
-        
-        try:
-            print(f"[{i+1}/{len(scenes_with_images)}] Generating voiceover for scene: {scene.scene}")
-            tts = gTTS(text=scene.narration, lang='en', slow=False)
-            tts.save(tts_path)
-            scene_with_voiceover.voiceover = tts_path
-            print(f"  -> Voiceover saved: {tts_path}")
-        except Exception as e:
-            error_msg = f"Failed to generate voiceover for {scene.scene}: {e}"
-            print(f"  ->  {error_msg}")
-            failed_voiceovers.append(scene.scene)
-        
-        scenes_with_voiceovers.append(scene_with_voiceover)
+    total = len(scenes_with_images)
+    if scenes_with_images:
+        max_workers = max(1, min(max_concurrency or settings.TTS_MAX_CONCURRENCY, total))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_generate_scene_voiceover, scene, i, total, output_dir)
+                for i, scene in enumerate(scenes_with_images)
+            ]
+            index_by_future = {future: i for i, future in enumerate(futures)}
+            for done_count, future in enumerate(as_completed(futures), 1):
+                i = index_by_future[future]
+                _, error = future.result()
+                report_progress(
+                    progress, "voiceovers", "failed" if error else "progress",
+                    scene_index=i, scene=scenes_with_images[i].scene, percent=100 * done_count / total,
+                    message=str(error) if error else None,
+                )
+
+            # Collect in scene order
+            for scene, future in zip(scenes_with_images, futures):
+                scene_with_voiceover, error = future.result()
+                if error:
+                    failed_voiceovers.append(scene.scene)
+                scenes_with_voiceovers.append(scene_with_voiceover)
     
     print(" Voiceover generation phase complete.\n")
+    report_progress(progress, "voiceovers", "completed", percent=100, message=f"{len(failed_voiceovers)} failed" if failed_voiceovers else None)
     
     # Raise exception if too many voiceovers failed
     if len(failed_voiceovers) == len(scenes_with_images):
-        raise Exception(f"All voiceover generations failed. Please check network connection and gTTS service.")
+        raise Exception(f"All voiceover generations failed. Please check the {engine.name} voiceover engine.")
     elif len(failed_voiceovers) > 0:
         print(f" Warning: {len(failed_voiceovers)} voiceovers failed to generate: {', '.join(failed_voiceovers)}")
     
@@ -302,100 +705,271 @@ def generate_voiceover(scenes_with_images: List["VideoGeneratorResponse"], outpu
 
 
 
-WORDS_PER_SECOND = 2.5 
-def assemble_final_video(scenes_with_voiceovers: List[VideoWithVoiceoverResponse], output_file="final_ai_video.mp4", bg_music_path=None):
-    """
-    Assemble final video automatically:
-    - Uses AI-generated video clips
-    - Synchronizes TTS voiceovers
-    - Adds background music (optional)
-    
-    Takes list of scenes with video clips and voiceovers already generated.
-    """
-    final_clips = []
-    audio_segments = []
-    total_time = 0
-    skipped_scenes = []
-
-    print("\n Starting Final Video Assembly (Video Clips + Narration) ---")
-
-    for i, scene_data in enumerate(scenes_with_voiceovers):
-        video_path = scene_data.video_path
-        if not video_path or not os.path.exists(video_path):
-            # Check for video_path, not image_path
-            warning_msg = f"Skipping Scene {i+1}: Missing video clip -> {video_path}"
-            print(f" {warning_msg}")
-            skipped_scenes.append(f"Scene {i+1} ({scene_data.scene})")
-            continue
+# ===== COMPLETE PIPELINE FUNCTION =====
+VIDEO_CLIPS_DIR = "generated_videos"
+VOICEOVER_DIR = "voice_overs"
+
+
+def _run_dir(directory: str, run_id: Optional[str]) -> str:
+    """`directory`/`run_id`, so concurrent runs never write to (or overwrite) each other's files."""
+    return os.path.join(directory, run_id) if run_id else directory
+
+
+class _StageProgress:
+    """Thread-safe per-scene completion counter for one pipeline stage."""
+
+    def __init__(self, progress, stage: str, total: int):
+        self._progress = progress
+        self._stage = stage
+        self._total = total
+        self._lock = threading.Lock()
+        self._done = 0
+        self.failed: List[str] = []
+        report_progress(progress, stage, "started", percent=0)
+        if total == 0:
+            report_progress(progress, stage, "completed", percent=100)
+
+    def scene_done(self, scene_index: int, scene: str, error: Optional[Exception] = None):
+        with self._lock:
+            self._done += 1
+            done = self._done
+            if error is not None:
+                self.failed.append(scene)
+            failed = len(self.failed)
+        report_progress(
+            self._progress, self._stage, "failed" if error else "progress",
+            scene_index=scene_index, scene=scene, percent=100 * done / self._total,
+            message=str(error) if error else None,
+        )
+        if done == self._total:
+            report_progress(self._progress, self._stage, "completed", percent=100, message=f"{failed} failed" if failed else None)
 
-        voiceover_path = scene_data.voiceover
-        if not voiceover_path or not os.path.exists(voiceover_path):
-            warning_msg = f"Skipping Scene {i+1}: No voiceover for scene '{scene_data.scene}'"
-            print(f" {warning_msg}")
-            skipped_scenes.append(f"Scene {i+1} ({scene_data.scene})")
-            continue
 
-        # Load narration audio to get duration
-        narration_audio = AudioFileClip(voiceover_path)
-        duration = narration_audio.duration
+class _ImageGate:
+    """
+    Holds back the Veo submissions of scenes whose image failed until one
+    image has succeeded. When every image fails (Nebius down, invalid key, ...)
+    the held submissions are cancelled instead, so no paid prompt-only clips
+    are generated for a run that is going to be aborted anyway.
+    Never blocks: held submissions run on the thread that opens the gate.
+    """
 
-        
-        print(f"[{i+1}/{len(scenes_with_voiceovers)}] Adding scene: {scene_data.scene} (duration: {duration:.2f}s)")
-        video_clip = VideoFileClip(video_path)
-        
-        video_clip = video_clip.with_duration(duration)
-        video_clip = video_clip.set_audio(narration_audio) 
+    def __init__(self, total: int):
+        self._lock = threading.Lock()
+        self._remaining = total
+        self._open = False
+        self._held = []
+
+    def image_done(self, success: bool, start=None, cancel=None):
+        """Reports one scene's image; `start` submits its clip, `cancel` gives it up."""
+        to_start, to_cancel = [], []
+        with self._lock:
+            self._remaining -= 1
+            if success:
+                self._open = True
+            if self._open:
+                # The reporting scene's own clip goes first, then those held back
+                to_start, self._held = self._held, []
+                if start is not None:
+                    to_start.insert(0, (start, cancel))
+            else:
+                if start is not None:
+                    self._held.append((start, cancel))
+                if self._remaining == 0:
+                    to_cancel, self._held = self._held, []
+        for held_start, _ in to_start:
+            held_start()
+        for _, held_cancel in to_cancel:
+            held_cancel()
 
-        final_clips.append(video_clip)
 
-        audio_segments.append(narration_audio.with_start(total_time))
-        total_time += duration
+def _run_scene_graph(story_scenes: List["StoryGeneratorResponse"], progress=None, checkpoint: Optional[PipelineCheckpoint] = None, run_id: Optional[str] = None) -> List["VideoWithVoiceoverResponse"]:
+    """
+    Generates the image, video clip and voiceover of every scene as a per-scene
+    dependency graph instead of stage by stage:
 
-    if not final_clips:
-        error_msg = "No valid video clips found. Cannot assemble final video."
-        print(f" {error_msg}")
-        if skipped_scenes:
-            error_msg += f" Skipped scenes: {', '.join(skipped_scenes)}"
-        raise Exception(error_msg)
+    - voiceovers only need the narration, so they are all started immediately;
+    - each scene's Veo generation is submitted as soon as its own image is ready
+      (a scene whose image failed still gets a prompt-only clip, as before,
+      but only once some image has succeeded: if every image fails, no clip
+      is submitted and the run is aborted, see _ImageGate).
 
-    if skipped_scenes:
-        print(f"\n Warning: {len(skipped_scenes)} scenes were skipped: {', '.join(skipped_scenes)}")
+    Waits until every scene is finished and returns them in scene order, so
+    the pipeline takes as long as its slowest scene rather than the sum of the
+    slowest image, clip and voiceover.
 
-    print(f"\n Concatenating {len(final_clips)} video clips...")
-    # Concatenate video clips
-    final_video_clip = concatenate_videoclips(final_clips, method="compose")
+    With a `checkpoint`, every scene stage is recorded as it finishes and
+    stages already completed with the same inputs are reused instead of run.
+    With a `run_id`, images, clips and voiceovers go to a `<dir>/<run_id>/`
+    subdirectory of their usual directory.
 
-    # Merge voiceovers + background music
-    print(" Compositing audio tracks...")
-    
-    # We now only need to composite the background music, as narration is on the video clips
-    if bg_music_path and os.path.exists(bg_music_path):
-        print(f"  -> Adding background music: {bg_music_path}")
-        bg_music = AudioFileClip(bg_music_path).with_volume_scaled(0.25).subclip(0, final_video_clip.duration)
-        
-        final_audio = CompositeAudioClip([final_video_clip.audio, bg_music])
-        final_video_clip = final_video_clip.set_audio(final_audio)
-    
- 
+    A misconfigured voiceover engine raises ValueError before any work is started.
+    """
+    voiceover_engine = get_voiceover_engine()
+    images_dir = _run_dir(OUTPUT_DIR, run_id)
+    clips_dir = _run_dir(VIDEO_CLIPS_DIR, run_id)
+    voiceovers_dir = _run_dir(VOICEOVER_DIR, run_id)
+    for directory in (images_dir, clips_dir, voiceovers_dir):
+        os.makedirs(directory, exist_ok=True)
+
+    # Scenes without an image prompt are dropped, like image_generator() does
+    scenes = []
+    for scene_data in story_scenes:
+        if not scene_data.prompts or not scene_data.prompts[0]:
+            print(f"Skipping scene '{scene_data.scene}': No valid prompt provided.")
+            continue
+        scenes.append(scene_data)
+    if not scenes:
+        raise Exception("No scenes with an image prompt. Cannot proceed with pipeline.")
+
+    total = len(scenes)
+    image_progress = _StageProgress(progress, "images", total)
+    video_progress = _StageProgress(progress, "videos", total)
+    voiceover_progress = _StageProgress(progress, "voiceovers", total)
+    image_gate = _ImageGate(total)
+    client = clients.nebius()
+
+    def checkpointed(index: int, stage: str, inputs_hash: str) -> Optional[str]:
+        artifact = checkpoint.completed_artifact(index, stage, inputs_hash) if checkpoint else None
+        if artifact:
+            print(f"  -> Reusing checkpointed {stage} for scene {index + 1}: {artifact}")
+        return artifact
+
+    def record(index: int, stage: str, inputs_hash: str, artifact: Optional[str] = None, error: Optional[BaseException] = None):
+        # A checkpoint that cannot be written must not fail (or, from a Veo callback, hang) the scene
+        if not checkpoint:
+            return
+        try:
+            checkpoint.record(index, stage, inputs_hash, artifact=artifact, error=str(error) if error else None)
+        except Exception as e:
+            print(f"  -> Warning: could not checkpoint {stage} for scene {index + 1}: {e}")
 
-    # Export final video
-    print(f"\n Exporting final video to {output_file} ...")
-    final_video_clip.write_videofile(output_file, fps=24, codec="libx264", audio_codec="aac")
-    print(f" Final video created successfully: {output_file}")
-    print(f"   Total duration: {final_video_clip.duration:.2f} seconds")
+    def voiceover_task(index: int, scene_data: "StoryGeneratorResponse"):
+        try:
+            inputs_hash = _voiceover_key(scene_data.narration)
+        except Exception as e:
+            # e.g. the voice model disappeared: fail this scene, not the whole graph
+            print(f"  ->  Failed to generate voiceover for {scene_data.scene}: {e}")
+            voiceover_progress.scene_done(index, scene_data.scene, e)
+            return VideoWithVoiceoverResponse(**scene_data.model_dump(), voiceover=None)
+        voiceover = checkpointed(index, "voiceover", inputs_hash)
+        if voiceover:
+            scene_with_voiceover = VideoWithVoiceoverResponse(**scene_data.model_dump(), voiceover=voiceover)
+            error = None
+        else:
+            scene_with_voiceover, error = _generate_scene_voiceover(scene_data, index, total, voiceovers_dir)
+            record(index, "voiceover", inputs_hash, scene_with_voiceover.voiceover, error)
+        voiceover_progress.scene_done(index, scene_data.scene, error)
+        return scene_with_voiceover
+
+    def image_then_video_task(index: int, scene_data: "StoryGeneratorResponse"):
+        image_hash = _image_key(scene_data.prompts[0])
+        image = checkpointed(index, "image", image_hash)
+        if image:
+            scene_with_image = ImageGeneratorResponse(**scene_data.model_dump(), image=image)
+            image_error = None
+        else:
+            scene_with_image, failed = _generate_scene_image(client, scene_data, index + 1, total, images_dir)
+            image_error = Exception("Image generation failed") if failed else None
+            record(index, "image", image_hash, scene_with_image.image, image_error)
+        image_progress.scene_done(index, scene_data.scene, image_error)
+
+        # A clip generated from another reference image (or none) is not reusable
+        video_hash = ArtifactCache.make_key(
+            model=VEO_MODEL,
+            prompt=scene_with_image.visual_cues,
+            image=None if image_error else image_hash,
+            config=VEO_CLIP_CONFIG,
+        )
+        # Resolved with the clip path once the (possibly held back) Veo generation finishes
+        video_future = Future()
+        video_path = checkpointed(index, "video", video_hash)
+        if video_path:
+            video_progress.scene_done(index, scene_data.scene)
+            video_future.set_result(video_path)
+            image_gate.image_done(image_error is None)
+            return scene_with_image, video_future
+
+        def on_video_done(future):
+            error = future.exception()
+            record(index, "video", video_hash, None if error else future.result(), error)
+            video_progress.scene_done(index, scene_data.scene, error)
+            if error:
+                video_future.set_exception(error)
+            else:
+                video_future.set_result(future.result())
+
+        def start_video():
+            safe_title = scene_data.scene.replace(" ", "_").replace(":", "")
+            output_path = os.path.join(clips_dir, f"{index + 1}_{safe_title}_{str(uuid.uuid4())[:8]}.mp4")
+            try:
+                veo_future = _submit_veo_generation(scene_with_image, output_path)
+            except Exception as e:
+                record(index, "video", video_hash, error=e)
+                video_progress.scene_done(index, scene_data.scene, e)
+                video_future.set_exception(e)
+                return
+            veo_future.add_done_callback(on_video_done)
+
+        def cancel_video():
+            error = Exception("Not generated: all image generations failed")
+            video_progress.scene_done(index, scene_data.scene, error)
+            video_future.set_exception(error)
+
+        image_gate.image_done(image_error is None, start_video, cancel_video)
+        return scene_with_image, video_future
+
+    tts_workers = max(1, min(settings.TTS_MAX_CONCURRENCY, total))
+    image_workers = max(1, min(settings.NEBIUS_MAX_CONCURRENCY, total))
+    with ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix="scene-tts") as tts_executor, \
+            ThreadPoolExecutor(max_workers=image_workers, thread_name_prefix="scene-image") as image_executor:
+        voiceover_futures = [tts_executor.submit(voiceover_task, i, scene_data) for i, scene_data in enumerate(scenes)]
+        image_futures = [image_executor.submit(image_then_video_task, i, scene_data) for i, scene_data in enumerate(scenes)]
+
+        scenes_with_voiceovers = []
+        for scene_data, image_future, voiceover_future in zip(scenes, image_futures, voiceover_futures):
+            scene_with_image, video_future = image_future.result()
+            video_path = None
+            try:
+                video_path = video_future.result()
+            except Exception as e:
+                print(f"\n Error generating video for {scene_data.scene}: {e}")
+            scene_dict = scene_with_image.model_dump()
+            scene_dict["video_path"] = video_path
+            scene_dict["voiceover"] = voiceover_future.result().voiceover
+            scenes_with_voiceovers.append(VideoWithVoiceoverResponse(**scene_dict))
+
+    if len(image_progress.failed) == total:
+        raise Exception("All image generations failed. Please check API keys and network connection.")
+    if len(video_progress.failed) == total:
+        raise Exception("All video generations failed. Please check API keys and service availability.")
+    if len(voiceover_progress.failed) == total:
+        raise Exception(f"All voiceover generations failed. Please check the {voiceover_engine.name} voiceover engine.")
+    for stage, stage_progress in (("images", image_progress), ("videos", video_progress), ("voiceovers", voiceover_progress)):
+        if stage_progress.failed:
+            print(f" Warning: {len(stage_progress.failed)} {stage} failed: {', '.join(stage_progress.failed)}")
 
-    return output_file
+    return scenes_with_voiceovers
 
 
-# ===== COMPLETE PIPELINE FUNCTION =====
-def complete_video_pipeline(story_scenes: List["StoryGeneratorResponse"], output_video_name="final_ai_video.mp4"):
+def complete_video_pipeline(story_scenes: List["StoryGeneratorResponse"], output_video_name="final_ai_video.mp4", render_executor=None, progress=None, checkpoint: Optional[PipelineCheckpoint] = None, run_id: Optional[str] = None):
     """
     Complete pipeline: 
-    Story Scripts → Reference Images (Nebius) → Video Clips (Veo) → Voiceovers → Final Video Assembly
+    Story Scripts → Reference Images (Nebius) → Video Clips (Veo) + Voiceovers → Final Video Assembly
+
+    Scenes flow through image → video independently and voiceovers run
+    alongside from the start (see _run_scene_graph); assembly starts once
+    every scene is ready.
 
     Args:
         story_scenes: List of StoryGeneratorResponse objects from story_generator()
         output_video_name: Name of the final output video file
+        render_executor: Optional executor (e.g. a process pool) the final render is submitted to
+        progress: Optional callback receiving stage and per-scene progress events
+        checkpoint: Optional PipelineCheckpoint; finished scene stages are recorded
+            in it and reused when the run is resumed
+        run_id: Optional id of the run; its intermediate files and the final video
+            are written to per-run directories (the video to generated_videos/<run_id>/)
 
     Returns:
         Path to the final assembled video
@@ -405,48 +979,35 @@ def complete_video_pipeline(story_scenes: List["StoryGeneratorResponse"], output
     print("=" * 60)
 
     try:
-        # --- Step 1: Generate Reference Images (Nebius/Flux) ---
-        # These images are used as visual cues or references for the Veo model.
-        print("\n STEP 1: Generating reference images for all scenes (using Nebius/Flux)...")
-        scenes_with_images = image_generator(scenes=story_scenes, output_dir=OUTPUT_DIR)
-
-        if not scenes_with_images:
-            raise Exception("No images generated. Cannot proceed with pipeline.")
-
-        # --- Step 2: Generate Video Clips (Veo 3.1) ---
-        # The Veo function uses the prompts/images from the previous step to create video clips.
-        # We must define a new directory for the videos to avoid mixing with reference images.
-        VIDEO_CLIPS_DIR = "generated_videos" 
-        os.makedirs(VIDEO_CLIPS_DIR, exist_ok=True)
-        print(f"\n STEP 2: Generating video clips for all scenes (using Veo 3.1 in {VIDEO_CLIPS_DIR})...")
-        scenes_with_videos = video_generator(
-            images=scenes_with_images, 
-            output_dir=VIDEO_CLIPS_DIR
-        )
-
-        if not scenes_with_videos:
-            raise Exception("No video clips generated. Cannot proceed with pipeline.")
-
-        # --- Step 3: Generate Voiceovers (gTTS) ---
-        # The voiceover function now takes the list of scenes WITH video paths.
-        print("\n STEP 3: Generating voiceovers for all scenes...")
-        # NOTE: generate_voiceover now expects VideoGeneratorResponse objects (which contain video_path)
-        scenes_with_voiceovers = generate_voiceover(scenes_with_images=scenes_with_videos)
-
-        if not scenes_with_voiceovers:
-            raise Exception("No voiceovers generated. Cannot proceed with pipeline.")
+        # --- Steps 1-3: Reference images (Nebius/Flux) → clips (Veo 3.1), voiceovers in parallel ---
+        print("\n STEPS 1-3: Generating images, video clips and voiceovers per scene...")
+        scenes_with_voiceovers = _run_scene_graph(story_scenes, progress=progress, checkpoint=checkpoint, run_id=run_id)
+        if run_id:
+            output_video_name = os.path.join(_run_dir(VIDEO_CLIPS_DIR, run_id), os.path.basename(output_video_name))
 
         # --- Step 4: Assemble Final Video (MoviePy) ---
         print("\n STEP 4: Assembling final video from video clips and voiceovers...")
 
-        final_video_path = assemble_final_video(
-            scenes_with_voiceovers=scenes_with_voiceovers,
-            output_file=output_video_name
-        )
+        if render_executor is not None:
+            # The callback cannot cross the process boundary, so only report start and end
+            report_progress(progress, "assembly", "started", percent=0)
+            final_video = render_executor.submit(
+                assemble_final_video,
+                scenes_with_voiceovers=scenes_with_voiceovers,
+                output_file=output_video_name
+            ).result()
+            report_progress(progress, "assembly", "completed", percent=100, message=f"{final_video.output_file} ({final_video.render_mode})")
+        else:
+            final_video = assemble_final_video(
+                scenes_with_voiceovers=scenes_with_voiceovers,
+                output_file=output_video_name,
+                progress=progress
+            )
+        final_video_path = final_video.output_file
 
         print("\n" + "=" * 60)
         print(" PIPELINE COMPLETE!")
-        print(f"Final video: {final_video_path}")
+        print(f"Final video: {final_video_path} (render mode: {final_video.render_mode})")
         print("=" * 60)
 
         return final_video_path
@@ -460,6 +1021,20 @@ def complete_video_pipeline(story_scenes: List["StoryGeneratorResponse"], output
 
 # ===== REGENERATION FUNCTIONS =====
 
+def _story_regeneration_prompt(summary: str, modifications: str = None, existing_story: StoryListResponse = None) -> str:
+    """Builds the story prompt, extended with the user's modifications or the existing scenes."""
+    base_prompt = image_generator_prompt(summary, _output_parser(StoryListResponse))
+
+    if modifications:
+        modification_instruction = f"\n\nIMPORTANT MODIFICATIONS REQUESTED BY USER:\n{modifications}\n\nPlease incorporate these modifications while maintaining the overall structure and format."
+        return base_prompt.format(video_summary=summary) + modification_instruction
+    if existing_story:
+        # If regenerating from existing, provide context
+        existing_scenes = "\n".join([f"- {scene.scene}: {scene.narration[:100]}..." for scene in existing_story.scenes])
+        return base_prompt.format(video_summary=summary) + f"\n\nExisting scenes for reference:\n{existing_scenes}\n\nPlease create a fresh version with improvements."
+    return base_prompt.format(video_summary=summary)
+
+
 def regenerate_story_with_modifications(summary: str, modifications: str = None, existing_story: StoryListResponse = None):
     """
     Regenerate story with user modifications or instructions.
@@ -473,104 +1048,100 @@ def regenerate_story_with_modifications(summary: str, modifications: str = None,
         StoryListResponse with modified scenes
     """
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=1.2
-        )
-        
-        # Build the prompt with modifications
-        base_prompt = image_generator_prompt(summary, pydanticParser)
+        llm = _structured_llm(STORY_MODEL, STORY_TEMPERATURE, StoryListResponse)
+        formatted_prompt = _story_regeneration_prompt(summary, modifications, existing_story)
         
-        if modifications:
-            modification_instruction = f"\n\nIMPORTANT MODIFICATIONS REQUESTED BY USER:\n{modifications}\n\nPlease incorporate these modifications while maintaining the overall structure and format."
-            formatted_prompt = base_prompt.format(video_summary=summary) + modification_instruction
-        elif existing_story:
-            # If regenerating from existing, provide context
-            existing_scenes = "\n".join([f"- {scene.scene}: {scene.narration[:100]}..." for scene in existing_story.scenes])
-            formatted_prompt = base_prompt.format(video_summary=summary) + f"\n\nExisting scenes for reference:\n{existing_scenes}\n\nPlease create a fresh version with improvements."
-        else:
-            formatted_prompt = base_prompt.format(video_summary=summary)
-        
-        result = llm.invoke(formatted_prompt)
-        parsed_output = pydanticParser.parse(result.content)
+        parsed_output = _invoke_structured(llm, formatted_prompt, StoryListResponse, "story.regenerate")
         return parsed_output
     except Exception as e:
         print(f"Error regenerating story: {e}")
         raise Exception(f"Failed to regenerate story: {str(e)}")
 
 
-def regenerate_specific_scenes(scenes_to_regenerate: List[int], existing_story: StoryListResponse, summary: str):
+def _prepare_scene_regeneration(scenes_to_regenerate: List[int], existing_story: StoryListResponse, summary: str):
+    """
+    Validates the requested indices and builds one prompt per scene.
+    Returns a copy of the scenes, the valid indices, their prompts and the rejected indices.
+    """
+    new_scenes = list(existing_story.scenes)  # Copy existing scenes
+    failed_scenes = []
+
+    indices = []
+    for idx in dict.fromkeys(scenes_to_regenerate):
+        if 0 <= idx < len(new_scenes):
+            indices.append(idx)
+        else:
+            failed_scenes.append(FailedSceneRegeneration(index=idx, error="Scene index out of range"))
+
+    prompts = [regenerate_scene_prompt(summary, new_scenes[idx]) for idx in indices]
+    return new_scenes, indices, prompts, failed_scenes
+
+
+def _merge_regenerated_scenes(new_scenes: list, indices: List[int], results: list, failed_scenes: List[FailedSceneRegeneration]) -> RegeneratedScenesResponse:
+    """Merges the regenerated scenes (or exceptions) of the batched LLM calls into `new_scenes` by index."""
+    regenerated_indices = []
+    for idx, new_scene in zip(indices, results):
+        old_scene = new_scenes[idx]
+        if isinstance(new_scene, Exception):
+            print(f"❌ Failed to regenerate scene {idx} ({old_scene.scene}): {new_scene}")
+            failed_scenes.append(FailedSceneRegeneration(index=idx, scene=old_scene.scene, error=str(new_scene)))
+            continue
+        new_scenes[idx] = new_scene
+        regenerated_indices.append(idx)
+        print(f"✅ Regenerated scene {idx}: {new_scene.scene}")
+
+    if not regenerated_indices:
+        errors = "; ".join(f"scene {f.index}: {f.error}" for f in failed_scenes) or "no scenes requested"
+        raise Exception(f"Failed to regenerate scenes: {errors}")
+
+    return RegeneratedScenesResponse(
+        scenes=new_scenes,
+        regenerated_indices=regenerated_indices,
+        failed_scenes=failed_scenes,
+    )
+
+
+def regenerate_specific_scenes(scenes_to_regenerate: List[int], existing_story: StoryListResponse, summary: str, max_concurrency: Optional[int] = None) -> RegeneratedScenesResponse:
     """
     Regenerate specific scenes by index while keeping others intact.
+
+    All requested scenes are sent to Gemini concurrently (at most
+    `max_concurrency`, defaulting to settings.SCENE_REGENERATION_MAX_CONCURRENCY)
+    and merged back by index. A scene that fails keeps its previous version
+    and is reported in `failed_scenes`.
     
     Args:
         scenes_to_regenerate: List of scene indices to regenerate (0-based)
         existing_story: Current story with all scenes
         summary: Original video summary
+        max_concurrency: Maximum number of Gemini calls in flight
     
     Returns:
-        StoryListResponse with specified scenes regenerated
+        RegeneratedScenesResponse with specified scenes regenerated
     """
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=1.3  # Slightly higher for variation
-        )
-        
-        new_scenes = list(existing_story.scenes)  # Copy existing scenes
-        
-        for idx in scenes_to_regenerate:
-            if 0 <= idx < len(new_scenes):
-                old_scene = new_scenes[idx]
-                
-                # Create a prompt to regenerate this specific scene
-                regenerate_prompt = f"""
-Based on the video summary below, regenerate the scene titled "{old_scene.scene}".
-
-Video Summary:
-{summary}
-
-Current scene that needs improvement:
-- Scene: {old_scene.scene}
-- Narration: {old_scene.narration}
-- Visual Cues: {old_scene.visual_cues}
-
-Please provide a FRESH and IMPROVED version of this scene with:
-1. A compelling narration
-2. Detailed visual cues
-3. AI-ready image generation prompts
-
-Return ONLY a valid JSON object with this structure:
-{{
-    "scene": "Scene title",
-    "narration": "Detailed narration text",
-    "visual_cues": "Detailed visual description",
-    "prompts": ["Image generation prompt"]
-}}
-"""
-                
-                result = llm.invoke(regenerate_prompt)
-                # Parse the result as a single scene
-                scene_parser = PydanticOutputParser(pydantic_object=StoryGeneratorResponse)
-                new_scene = scene_parser.parse(result.content)
-                new_scenes[idx] = new_scene
-                print(f"✅ Regenerated scene {idx}: {new_scene.scene}")
-        
-        return StoryListResponse(scenes=new_scenes)
-    except Exception as e:
-        print(f"Error regenerating specific scenes: {e}")
-        raise Exception(f"Failed to regenerate scenes: {str(e)}")
+    new_scenes, indices, prompts, failed_scenes = _prepare_scene_regeneration(scenes_to_regenerate, existing_story, summary)
 
+    results = []
+    if indices:
+        try:
+            llm = _structured_llm(STORY_MODEL, SCENE_REGENERATION_TEMPERATURE, StoryGeneratorResponse)
+            max_concurrency = max(1, min(max_concurrency or settings.SCENE_REGENERATION_MAX_CONCURRENCY, len(prompts)))
+            results = _batch_structured(llm, prompts, StoryGeneratorResponse, "scene.regenerate", max_concurrency)
+        except Exception as e:
+            print(f"Error regenerating specific scenes: {e}")
+            raise Exception(f"Failed to regenerate scenes: {str(e)}")
 
-def regenerate_single_image(scene: StoryGeneratorResponse, output_dir: str) -> ImageGeneratorResponse:
+    return _merge_regenerated_scenes(new_scenes, indices, results, failed_scenes)
+
+
+def regenerate_single_image(scene: StoryGeneratorResponse, output_dir: str, bypass_cache: bool = False) -> ImageGeneratorResponse:
     """
     Regenerate a single image for a specific scene.
     
     Args:
         scene: Scene data with prompts
         output_dir: Directory to save the image
+        bypass_cache: Always call Nebius, even if this prompt was generated before
     
     Returns:
         ImageGeneratorResponse with the new image path
@@ -578,11 +1149,6 @@ def regenerate_single_image(scene: StoryGeneratorResponse, output_dir: str) -> I
     try:
         os.makedirs(output_dir, exist_ok=True)
         
-        client_nebius = OpenAI(
-            base_url="https://api.studio.nebius.com/v1/",
-            api_key=settings.NEBIUS_API_KEYS
-        )
-        
         prompt_text = scene.prompts[0] if scene.prompts else scene.visual_cues
         scene_title_safe = scene.scene.replace(' ', '_').replace(':', '')
         
@@ -592,25 +1158,9 @@ def regenerate_single_image(scene: StoryGeneratorResponse, output_dir: str) -> I
         
         print(f"🎨 Regenerating image for scene: {scene.scene}")
         
-        # Generate image
-        response = client_nebius.images.generate(
-            model="black-forest-labs/flux-dev",
-            prompt=prompt_text,
-        )
-        
-        image_url = getattr(response.data[0], "url", None)
-        if not image_url:
-            raise ValueError("No image URL returned by API.")
+        from_cache = _fetch_image(clients.nebius(), prompt_text, image_filename, bypass_cache=bypass_cache)
         
-        # Download image
-        image_response = requests.get(image_url, stream=True)
-        image_response.raise_for_status()
-        
-        with open(image_filename, 'wb') as file:
-            for chunk in image_response.iter_content(chunk_size=8192):
-                file.write(chunk)
-        
-        print(f"✅ Image saved: {image_filename}")
+        print(f"✅ Image {'reused from cache' if from_cache else 'saved'}: {image_filename}")
         
         # Create response object
         scene_dict = scene.model_dump()
@@ -622,6 +1172,28 @@ def regenerate_single_image(scene: StoryGeneratorResponse, output_dir: str) -> I
         raise Exception(f"Failed to regenerate image: {str(e)}")
 
 
+def _submit_video_regeneration(image_scene: ImageGeneratorResponse, output_dir: str):
+    """Submits a new clip for one scene; returns the scene and the clip's Future."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    safe_title = image_scene.scene.replace(" ", "_").replace(":", "")
+    unique_id = str(uuid.uuid4())[:8]
+    output_path = os.path.join(output_dir, f"{safe_title}_{unique_id}.mp4")
+
+    print(f" Regenerating video for scene: {image_scene.scene}")
+    return _video_scene(image_scene), _submit_veo_generation(image_scene, output_path)
+
+
+def _finish_video_regeneration(video_scene: VideoGeneratorResponse, future: Future) -> VideoGeneratorResponse:
+    """Sets the clip of the finished `future`; a failed generation leaves video_path empty."""
+    try:
+        video_scene.video_path = future.result()
+        print(f"\n Video saved: {video_scene.video_path}")
+    except Exception as e:
+        print(f"\n Video generation failed: {e}")
+    return video_scene
+
+
 def regenerate_single_video(image_scene: ImageGeneratorResponse, output_dir: str) -> VideoGeneratorResponse:
     """
     Regenerate a single video clip for a specific scene.
@@ -634,84 +1206,26 @@ def regenerate_single_video(image_scene: ImageGeneratorResponse, output_dir: str
         VideoGeneratorResponse with the new video path
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
-        safe_title = image_scene.scene.replace(" ", "_").replace(":", "")
-        unique_id = str(uuid.uuid4())[:8]
-        output_path = os.path.join(output_dir, f"{safe_title}_{unique_id}.mp4")
-        
-        video_scene = VideoGeneratorResponse(
-            scene=image_scene.scene,
-            narration=image_scene.narration,
-            visual_cues=image_scene.visual_cues,
-            prompts=image_scene.prompts,
-            image=image_scene.image,
-            video_path=None,
-        )
-        
-        uploaded_file = None
-        
-        try:
-            # Upload reference image if available
-            if image_scene.image and os.path.exists(image_scene.image):
-                print(f" Uploading reference image: {image_scene.image}")
-                uploaded_file = client.files.upload(file=image_scene.image)
-            
-            # Configure video generation
-            config_kwargs = {
-                "duration_seconds": 4,
-                "aspect_ratio": "16:9",
-            }
-            if uploaded_file:
-                config_kwargs["reference_images"] = [uploaded_file]
-            config = types.GenerateVideosConfig(**config_kwargs)
-            
-            # Generate video
-            print(f" Regenerating video for scene: {image_scene.scene}")
-            operation = client.models.generate_videos(
-                model="veo-3.1-generate-preview",
-                prompt=image_scene.visual_cues,
-                config=config,
-            )
-            
-            # Poll until complete
-            print(" Waiting for video generation...")
-            while not operation.done:
-                print(".", end="", flush=True)
-                time.sleep(10)
-                operation = client.operations.get(operation.name)
-            
-            # Download video
-            if getattr(operation, "response", None) and getattr(operation.response, "generated_videos", None):
-                generated_video = operation.response.generated_videos[0]
-                client.files.download(file=generated_video.video, output_path=output_path)
-                video_scene.video_path = output_path
-                print(f"\n Video saved: {output_path}")
-            else:
-                print(f"\n Video generation failed")
-                
-        finally:
-            # Cleanup
-            if uploaded_file:
-                try:
-                    client.files.delete(name=uploaded_file.name)
-                except Exception:
-                    pass
-        
-        return video_scene
+        video_scene, future = _submit_video_regeneration(image_scene, output_dir)
+
+        print(" Waiting for video generation...")
+        wait([future])
+        return _finish_video_regeneration(video_scene, future)
         
     except Exception as e:
         print(f" Error regenerating video: {e}")
         raise Exception(f"Failed to regenerate video: {str(e)}")
 
 
-def regenerate_single_voiceover(scene: VideoGeneratorResponse, output_dir: str = "voice_overs") -> VideoWithVoiceoverResponse:
+def regenerate_single_voiceover(scene: VideoGeneratorResponse, output_dir: str = "voice_overs", bypass_cache: bool = False) -> VideoWithVoiceoverResponse:
     """
     Regenerate voiceover for a single scene.
+    If the narration is unchanged, the cached audio is reused instead of synthesizing it again.
     
     Args:
         scene: Scene with narration text
         output_dir: Directory to save voiceover
+        bypass_cache: Always synthesize, even if this narration was synthesized before
     
     Returns:
         VideoWithVoiceoverResponse with new voiceover path
@@ -722,19 +1236,18 @@ def regenerate_single_voiceover(scene: VideoGeneratorResponse, output_dir: str =
         unique_id = str(uuid.uuid4())[:8]
         tts_path = os.path.join(
             output_dir,
-            f"{scene.scene.replace(' ', '_').replace(':', '')}_{unique_id}.mp3"
+            f"{scene.scene.replace(' ', '_').replace(':', '')}_{unique_id}{get_voiceover_engine().extension}"
         )
         
         print(f" Regenerating voiceover for scene: {scene.scene}")
         
-        tts = gTTS(text=scene.narration, lang='en', slow=False)
-        tts.save(tts_path)
+        from_cache = _synthesize_voiceover(scene.narration, tts_path, bypass_cache=bypass_cache)
         
         scene_dict = scene.model_dump()
         scene_dict["voiceover"] = tts_path
         result = VideoWithVoiceoverResponse(**scene_dict)
         
-        print(f" Voiceover saved: {tts_path}")
+        print(f" Voiceover {'reused from cache' if from_cache else 'saved'}: {tts_path}")
         return result
         
     except Exception as e:
@@ -742,28 +1255,9 @@ def regenerate_single_voiceover(scene: VideoGeneratorResponse, output_dir: str =
         raise Exception(f"Failed to regenerate voiceover: {str(e)}")
 
 
-def modify_scene_with_user_input(scene: StoryGeneratorResponse, user_input: str, summary: str = "") -> StoryGeneratorResponse:
-    """
-    Modify a scene based on user input/feedback.
-    AI merges the current scene data with user's requested changes.
-    
-    Args:
-        scene: Current scene data
-        user_input: User's requested changes or opinions
-        summary: Optional video summary for context
-    
-    Returns:
-        StoryGeneratorResponse with modified scene
-    """
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.9
-        )
-        
-        # Create a prompt that merges user input with existing scene
-        modification_prompt = f"""
+def _scene_modification_prompt(scene: StoryGeneratorResponse, user_input: str, summary: str = "") -> str:
+    """Prompt asking Gemini to merge the user's feedback into the scene (JSON output)."""
+    return f"""
 You are an AI assistant helping to modify a video scene based on user feedback.
 
 CURRENT SCENE:
@@ -794,43 +1288,39 @@ Return ONLY a valid JSON object with this exact structure:
     "prompts": ["Detailed AI image generation prompt incorporating changes"]
 }}
 """
-        
-        result = llm.invoke(modification_prompt)
-        scene_parser = PydanticOutputParser(pydantic_object=StoryGeneratorResponse)
-        modified_scene = scene_parser.parse(result.content)
-        
-        print(f" Scene modified based on user input: {modified_scene.scene}")
-        return modified_scene
-        
-    except Exception as e:
-        print(f" Error modifying scene: {e}")
-        return scene  # Return original on error
 
 
-def modify_image_prompt_and_generate(scene: StoryGeneratorResponse, user_input: str, output_dir: str) -> ImageGeneratorResponse:
+def modify_scene_with_user_input(scene: StoryGeneratorResponse, user_input: str, summary: str = "") -> StoryGeneratorResponse:
     """
-    Modify image prompt based on user input and generate new image.
-    AI merges the current prompt with user's requested changes.
+    Modify a scene based on user input/feedback.
+    AI merges the current scene data with user's requested changes.
     
     Args:
-        scene: Current scene data with image prompt
-        user_input: User's requested changes for the image
-        output_dir: Directory to save the new image
+        scene: Current scene data
+        user_input: User's requested changes or opinions
+        summary: Optional video summary for context
     
     Returns:
-        ImageGeneratorResponse with the new image
+        StoryGeneratorResponse with modified scene
     """
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.8
-        )
+        llm = _structured_llm(STORY_MODEL, SCENE_EDIT_TEMPERATURE, StoryGeneratorResponse)
+        modification_prompt = _scene_modification_prompt(scene, user_input, summary)
+        
+        modified_scene = _invoke_structured(llm, modification_prompt, StoryGeneratorResponse, "scene.modify")
         
-        current_prompt = scene.prompts[0] if scene.prompts else scene.visual_cues
+        print(f" Scene modified based on user input: {modified_scene.scene}")
+        return modified_scene
         
-        # Create a prompt to merge user input with existing prompt
-        merge_prompt = f"""
+    except Exception as e:
+        print(f" Error modifying scene: {e}")
+        return scene  # Return original on error
+
+
+def _image_prompt_merge_prompt(scene: StoryGeneratorResponse, user_input: str) -> str:
+    """Prompt asking Gemini to merge the user's changes into the scene's image prompt (plain text output)."""
+    current_prompt = scene.prompts[0] if scene.prompts else scene.visual_cues
+    return f"""
 You are an AI assistant specializing in image generation prompts.
 
 CURRENT IMAGE PROMPT:
@@ -855,8 +1345,26 @@ REQUIREMENTS:
 
 Return ONLY the improved prompt text, no JSON, no extra formatting, just the prompt itself.
 """
+
+
+def modify_image_prompt_and_generate(scene: StoryGeneratorResponse, user_input: str, output_dir: str) -> ImageGeneratorResponse:
+    """
+    Modify image prompt based on user input and generate new image.
+    AI merges the current prompt with user's requested changes.
+    
+    Args:
+        scene: Current scene data with image prompt
+        user_input: User's requested changes for the image
+        output_dir: Directory to save the new image
+    
+    Returns:
+        ImageGeneratorResponse with the new image
+    """
+    try:
+        llm = clients.chat(STORY_MODEL, IMAGE_PROMPT_TEMPERATURE)
+        merge_prompt = _image_prompt_merge_prompt(scene, user_input)
         
-        result = llm.invoke(merge_prompt)
+        result = llm.invoke(merge_prompt, config=llm_run_config("image_prompt.modify"))
         enhanced_prompt = result.content.strip()
         
         print(f" Enhanced prompt: {enhanced_prompt[:100]}...")
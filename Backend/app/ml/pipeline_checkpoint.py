@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+from app.core.config import settings
+
+
+class PipelineCheckpoint:
+    """
+    Per-run record of finished pipeline work, persisted as JSON so an
+    interrupted or failed run can be resumed without regenerating everything.
+
+    Every scene stage (image, video, voiceover) is stored with the hash of its
+    inputs, its status and the artifact it produced. A stage is only reused
+    when the inputs hash matches and the artifact is still on disk unchanged
+    (same size and mtime), so edited scenes and overwritten files are redone.
+    Run-level values (e.g. the generated story) are stored the same way.
+    """
+
+    STAGE_COMPLETED = "completed"
+    STAGE_FAILED = "failed"
+
+    def __init__(self, path: str, run_id: str):
+        self.path = path
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._data = {"run_id": run_id, "values": {}, "scenes": {}}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f" Ignoring unreadable checkpoint {path}: {e}")
+
+    @staticmethod
+    def safe_run_id(run_id: str) -> str:
+        """The name a run is stored under: `run_id` without anything but letters, digits, '-' and '_'."""
+        safe_run_id = "".join(ch for ch in run_id if ch.isalnum() or ch in "-_")
+        if not safe_run_id:
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        return safe_run_id
+
+    @classmethod
+    def for_run(cls, run_id: str, directory: Optional[str] = None) -> "PipelineCheckpoint":
+        """Opens (or starts) the checkpoint of `run_id` in settings.PIPELINE_CHECKPOINT_DIR."""
+        safe_run_id = cls.safe_run_id(run_id)
+        return cls(os.path.join(directory or settings.PIPELINE_CHECKPOINT_DIR, f"{safe_run_id}.json"), safe_run_id)
+
+    def get_value(self, name: str, inputs_hash: str) -> Optional[Any]:
+        """Returns the run-level value stored for `name` if it was built from the same inputs."""
+        with self._lock:
+            entry = self._data["values"].get(name)
+        if entry and entry["inputs"] == inputs_hash:
+            return entry["value"]
+        return None
+
+    def put_value(self, name: str, inputs_hash: str, value: Any):
+        with self._lock:
+            self._data["values"][name] = {"inputs": inputs_hash, "value": value, "updated_at": time.time()}
+            self._save()
+
+    def completed_artifact(self, scene_index: int, stage: str, inputs_hash: str) -> Optional[str]:
+        """
+        Returns the artifact of a completed scene stage, or None when the stage
+        has to run (not completed, different inputs, or the file changed).
+        """
+        with self._lock:
+            entry = self._data["scenes"].get(str(scene_index), {}).get(stage)
+        if not entry or entry["status"] != self.STAGE_COMPLETED or entry["inputs"] != inputs_hash:
+            return None
+        artifact = entry.get("artifact")
+        try:
+            stat = os.stat(artifact)
+        except (OSError, TypeError):
+            return None
+        if stat.st_size != entry.get("size") or stat.st_mtime != entry.get("mtime"):
+            return None
+        return artifact
+
+    def record(self, scene_index: int, stage: str, inputs_hash: str, artifact: Optional[str] = None, error: Optional[str] = None):
+        """Stores the outcome of a scene stage: completed with `artifact`, or failed with `error`."""
+        entry = {
+            "status": self.STAGE_FAILED if error else self.STAGE_COMPLETED,
+            "inputs": inputs_hash,
+            "artifact": artifact,
+            "error": error,
+            "updated_at": time.time(),
+        }
+        if artifact and not error:
+            stat = os.stat(artifact)
+            entry["size"] = stat.st_size
+            entry["mtime"] = stat.st_mtime
+        with self._lock:
+            self._data["scenes"].setdefault(str(scene_index), {})[stage] = entry
+            self._save()
+
+    def _save(self):
+        # Write to a temporary file first so a crash never leaves a truncated checkpoint
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.path)
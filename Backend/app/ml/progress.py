@@ -0,0 +1,11 @@
+def report_progress(progress, stage: str, status: str = "progress", **details):
+    """
+    Sends a progress update to the optional `progress` callback.
+    Reporting must never break the pipeline, so callback errors are only logged.
+    """
+    if progress is None:
+        return
+    try:
+        progress(stage=stage, status=status, **details)
+    except Exception as e:
+        print(f" Progress reporting failed: {e}")
@@ -0,0 +1,134 @@
+import os
+import threading
+from typing import Callable, Collection, List, Optional
+from app.schemas.ml_process_response import RenderResourceReport
+
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# Seconds between memory samples while a render runs
+SAMPLE_INTERVAL = 0.2
+
+
+def _child_pids(pid: int) -> List[int]:
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", "r") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def _process_tree(pid: int) -> List[int]:
+    """`pid` and all of its descendants (ffmpeg readers/writers, segment workers, ...)."""
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(_child_pids(current))
+    return tree
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0  # already exited
+
+
+def _is_ffmpeg(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/comm", "r") as f:
+            return "ffmpeg" in f.read()
+    except OSError:
+        return False
+
+
+def open_fd_count() -> Optional[int]:
+    """Open file descriptors of this process, or None where /proc is not available."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _child_tree() -> List[int]:
+    """Descendants of this process."""
+    return _process_tree(os.getpid())[1:]
+
+
+def ffmpeg_process_count(exclude: Collection[int] = ()) -> Optional[int]:
+    """ffmpeg processes started by this process (directly or by its workers), except `exclude`."""
+    if not os.path.isdir("/proc/self/task"):
+        return None
+    return sum(_is_ffmpeg(pid) for pid in _child_tree() if pid not in exclude)
+
+
+class RenderResourceMonitor:
+    """
+    Measures the resources of one render. Child processes already running
+    when the render starts (e.g. other renders' ffmpeg) are left out, except
+    the long-lived workers returned by `shared_workers` (the segment process
+    pool) that do this render's encoding: while it runs, the resident memory
+    of this process, those workers and the child processes started since is
+    sampled for the peak, and ffmpeg processes started during the render and
+    still running afterwards are reported as leaked readers.
+
+    Open file descriptors are those of the whole process, so with concurrent
+    renders the before/after difference is not attributable to this one.
+    A child started by a concurrent render is counted too; run renders one at
+    a time when hunting leaks.
+
+    Relies on /proc (Linux); elsewhere the report fields are None.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, shared_workers: Optional[Callable[[], Collection[int]]] = None):
+        self.interval = interval
+        self.shared_workers = shared_workers
+        self._available = os.path.isdir("/proc/self/task")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._peak_bytes = 0
+        self._fds_before = self._fds_after = None
+        self._ffmpeg_before = self._ffmpeg_after = None
+        self._existing_children = frozenset()
+
+    def _sample(self):
+        pids = [os.getpid()] + [pid for pid in _child_tree() if pid not in self._existing_children]
+        total = sum(_rss_bytes(pid) for pid in pids)
+        self._peak_bytes = max(self._peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RenderResourceMonitor":
+        self._fds_before = open_fd_count()
+        self._ffmpeg_before = ffmpeg_process_count()
+        if self._available:
+            workers = set(self.shared_workers()) if self.shared_workers else set()
+            self._existing_children = frozenset(pid for pid in _child_tree() if pid not in workers)
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="render-resources", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        self._fds_after = open_fd_count()
+        self._ffmpeg_after = ffmpeg_process_count(exclude=self._existing_children)
+        return False
+
+    def report(self) -> RenderResourceReport:
+        return RenderResourceReport(
+            peak_memory_mb=round(self._peak_bytes / (1024 * 1024), 1) if self._available else None,
+            open_fds_before=self._fds_before,
+            open_fds_after=self._fds_after,
+            ffmpeg_processes_before=self._ffmpeg_before,
+            ffmpeg_processes_after=self._ffmpeg_after,
+        )
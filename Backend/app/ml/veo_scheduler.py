@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+VEO_MODEL = "veo-3.1-generate-preview"
+
+
+@dataclass
+class _TrackedOperation:
+    name: str  # key in _pending, fixed at submit time
+    operation: Any
+    label: str
+    output_path: str
+    future: Future
+    submitted_at: float
+    next_poll_at: float
+    interval: float
+    on_finish: Optional[Callable[[], None]] = None
+    poll_errors: int = 0
+
+
+class VeoOperationScheduler:
+    """
+    Tracks Veo long-running video operations from a single polling thread.
+
+    Operations are submitted up front with `submit()`, which returns a Future
+    resolved with the local video path once the clip is downloaded. One
+    background thread polls every outstanding operation with per-operation
+    exponential backoff and hands finished ones to a small download pool, so
+    N scenes take roughly as long as the slowest one instead of the sum.
+    """
+
+    def __init__(
+        self,
+        client,
+        initial_interval: float = 5.0,
+        max_interval: float = 30.0,
+        backoff_factor: float = 1.5,
+        timeout: float = 900.0,
+        download_workers: int = 4,
+        max_poll_errors: int = 5,
+    ):
+        self._client = client
+        self._initial_interval = initial_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self._timeout = timeout
+        self._max_poll_errors = max_poll_errors
+        self._pending: Dict[str, _TrackedOperation] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="veo-download")
+
+    def submit(self, prompt: str, config, output_path: str, label: str = "", on_finish: Optional[Callable[[], None]] = None, model: str = VEO_MODEL) -> Future:
+        """
+        Submit a Veo generation and start tracking it.
+
+        Args:
+            prompt: Text prompt for the video
+            config: types.GenerateVideosConfig for the request
+            output_path: Where the finished clip is saved
+            label: Human readable name used in log output
+            on_finish: Called once the operation is finished (success or failure),
+                e.g. to delete an uploaded reference image
+            model: Veo model name
+
+        Returns:
+            Future resolved with output_path, or with the generation error
+        """
+        future: Future = Future()
+        try:
+            operation = self._client.models.generate_videos(model=model, prompt=prompt, config=config)
+        except Exception as e:
+            print(f" Failed to submit video generation for {label}: {e}")
+            future.set_exception(e)
+            self._run_on_finish(on_finish)
+            return future
+
+        now = time.monotonic()
+        tracked = _TrackedOperation(
+            name=operation.name,
+            operation=operation,
+            label=label,
+            output_path=output_path,
+            future=future,
+            submitted_at=now,
+            next_poll_at=now + self._initial_interval,
+            interval=self._initial_interval,
+            on_finish=on_finish,
+        )
+        print(f" Submitted video generation for {label}: {operation.name}")
+
+        with self._condition:
+            self._pending[operation.name] = tracked
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll_loop, name="veo-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _poll_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                now = time.monotonic()
+                due = [t for t in self._pending.values() if t.next_poll_at <= now]
+                if not due:
+                    next_due = min(t.next_poll_at for t in self._pending.values())
+                    self._condition.wait(timeout=max(0.0, next_due - now))
+                    continue
+
+            for tracked in due:
+                # An unexpected error must fail this operation only, not the polling thread (and every other clip)
+                try:
+                    self._poll(tracked)
+                except Exception as e:
+                    self._untrack(tracked)
+                    self._fail(tracked, Exception(f"Tracking video generation for {tracked.label} failed: {e}"))
+
+    def _poll(self, tracked: _TrackedOperation):
+        try:
+            operation = self._client.operations.get(tracked.operation)
+            tracked.poll_errors = 0
+        except Exception as e:
+            tracked.poll_errors += 1
+            print(f" Polling failed for {tracked.label} ({tracked.poll_errors}/{self._max_poll_errors}): {e}")
+            if tracked.poll_errors >= self._max_poll_errors:
+                self._untrack(tracked)
+                self._fail(tracked, Exception(f"Lost track of video generation for {tracked.label}: {e}"))
+            else:
+                self._reschedule(tracked)
+            return
+
+        tracked.operation = operation
+        if operation.done:
+            self._untrack(tracked)
+            self._downloads.submit(self._download, tracked)
+        elif time.monotonic() - tracked.submitted_at > self._timeout:
+            self._untrack(tracked)
+            self._fail(tracked, TimeoutError(f"Video generation for {tracked.label} timed out after {self._timeout:.0f}s"))
+        else:
+            self._reschedule(tracked)
+
+    def _reschedule(self, tracked: _TrackedOperation):
+        tracked.interval = min(tracked.interval * self._backoff_factor, self._max_interval)
+        tracked.next_poll_at = time.monotonic() + tracked.interval
+
+    def _untrack(self, tracked: _TrackedOperation):
+        with self._condition:
+            self._pending.pop(tracked.name, None)
+
+    def _download(self, tracked: _TrackedOperation):
+        operation = tracked.operation
+        try:
+            if getattr(operation, "response", None) and getattr(operation.response, "generated_videos", None):
+                generated_video = operation.response.generated_videos[0]
+                self._client.files.download(file=generated_video.video)
+                generated_video.video.save(tracked.output_path)
+                elapsed = time.monotonic() - tracked.submitted_at
+                print(f" Video generated and saved for {tracked.label} after {elapsed:.0f}s: {tracked.output_path}")
+                tracked.future.set_result(tracked.output_path)
+            else:
+                error_detail = getattr(operation, "error", None) or "No details available"
+                raise Exception(f"Video generation failed for {tracked.label}: {error_detail}")
+        except Exception as e:
+            print(f" {e}")
+            tracked.future.set_exception(e)
+        finally:
+            self._run_on_finish(tracked.on_finish)
+
+    def _fail(self, tracked: _TrackedOperation, error: Exception):
+        if tracked.future.done():
+            return
+        print(f" {error}")
+        tracked.future.set_exception(error)
+        self._run_on_finish(tracked.on_finish)
+
+    @staticmethod
+    def _run_on_finish(on_finish: Optional[Callable[[], None]]):
+        if on_finish is None:
+            return
+        try:
+            on_finish()
+        except Exception as cleanup_err:
+            print(f" Cleanup failed: {cleanup_err}")
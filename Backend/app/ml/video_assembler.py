@@ -0,0 +1,482 @@
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.ml_process_response import VideoWithVoiceoverResponse, FinalVideoResponse
+from app.ml.artifact_cache import ArtifactCache
+from app.ml.progress import report_progress
+from app.ml.render_resources import RenderResourceMonitor
+
+
+RENDER_MODE_STREAM_COPY = "stream_copy"
+RENDER_MODE_REENCODE = "reencode"
+RENDER_MODE_PREVIEW = "preview"
+
+# Video codecs the concat demuxer can join into an MP4 without re-encoding
+STREAM_COPY_CODECS = ("h264", "hevc")
+# How much longer (seconds) a narration may run than its clip and still be stream copied
+DURATION_TOLERANCE = 0.05
+BG_MUSIC_VOLUME = 0.25
+REENCODE_FPS = 24
+# Preview renders: reduced height and frame rate, fastest x264 preset, written next to the final output
+PREVIEW_MAX_HEIGHT = 360
+PREVIEW_FPS = 12
+PREVIEW_VIDEO_ENCODE_ARGS = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "30", "-pix_fmt", "yuv420p"]
+PREVIEW_SUFFIX = "_preview"
+# Narration is always re-encoded (audio is cheap) to identical parameters so the segments concat cleanly
+AUDIO_ENCODE_ARGS = ["-c:a", "aac", "-b:a", "192k", "-ar", "44100", "-ac", "2"]
+# Bump when segment rendering changes so cached segments are rendered again
+SEGMENT_FORMAT_VERSION = "1"
+
+segment_cache = ArtifactCache(settings.SEGMENT_CACHE_DIR, settings.SEGMENT_CACHE_MAX_BYTES, extension=".mp4")
+
+# Worker processes for re-encoded segments, created on first parallel render
+_segment_pool: Optional[ProcessPoolExecutor] = None
+_segment_pool_lock = threading.Lock()
+
+
+@dataclass
+class _SceneInput:
+    index: int
+    scene: str
+    video_path: str
+    voiceover: str
+    clip_format: tuple
+    clip_size: Tuple[int, int]
+    clip_duration: float
+    narration_duration: float
+
+
+def _collect_scenes(scenes_with_voiceovers: List[VideoWithVoiceoverResponse], progress=None) -> Tuple[List[Tuple[int, VideoWithVoiceoverResponse]], List[str]]:
+    """
+    Splits the scenes into those that can be rendered and the titles of the skipped ones.
+    """
+    usable = []
+    skipped_scenes = []
+    for i, scene_data in enumerate(scenes_with_voiceovers):
+        video_path = scene_data.video_path
+        if not video_path or not os.path.exists(video_path):
+            print(f" Skipping Scene {i+1}: Missing video clip -> {video_path}")
+            skipped_scenes.append(f"Scene {i+1} ({scene_data.scene})")
+            report_progress(progress, "assembly", "failed", scene_index=i, scene=scene_data.scene, message="Missing video clip")
+            continue
+
+        voiceover_path = scene_data.voiceover
+        if not voiceover_path or not os.path.exists(voiceover_path):
+            print(f" Skipping Scene {i+1}: No voiceover for scene '{scene_data.scene}'")
+            skipped_scenes.append(f"Scene {i+1} ({scene_data.scene})")
+            report_progress(progress, "assembly", "failed", scene_index=i, scene=scene_data.scene, message="Missing voiceover")
+            continue
+
+        usable.append((i, scene_data))
+
+    if not usable:
+        error_msg = "No valid video clips found. Cannot assemble final video."
+        print(f" {error_msg}")
+        if skipped_scenes:
+            error_msg += f" Skipped scenes: {', '.join(skipped_scenes)}"
+        raise Exception(error_msg)
+
+    if skipped_scenes:
+        print(f"\n Warning: {len(skipped_scenes)} scenes were skipped: {', '.join(skipped_scenes)}")
+
+    return usable, skipped_scenes
+
+
+
+
+def _probe_scenes(scenes: List[Tuple[int, VideoWithVoiceoverResponse]]) -> List[_SceneInput]:
+    """Reads format and duration of every clip and narration without decoding them."""
+    # MoviePy is imported on first render; importing it is a large part of API startup time
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    inputs = []
+    for i, scene_data in scenes:
+        try:
+            clip_info = ffmpeg_parse_infos(scene_data.video_path)
+            narration_info = ffmpeg_parse_infos(scene_data.voiceover)
+        except Exception as e:
+            raise Exception(f"Scene {i+1}: could not read inputs: {e}")
+
+        if not clip_info.get("video_found"):
+            raise Exception(f"Scene {i+1}: no video stream in {scene_data.video_path}")
+        if not narration_info.get("duration"):
+            raise Exception(f"Scene {i+1}: could not read narration duration of {scene_data.voiceover}")
+
+        clip_size = tuple(clip_info.get("video_size") or (0, 0))
+        inputs.append(_SceneInput(
+            index=i,
+            scene=scene_data.scene,
+            video_path=scene_data.video_path,
+            voiceover=scene_data.voiceover,
+            clip_format=(clip_info.get("video_codec_name"), clip_info.get("video_profile"), clip_size, clip_info.get("video_fps")),
+            clip_size=clip_size,
+            clip_duration=clip_info.get("duration") or 0.0,
+            narration_duration=narration_info["duration"],
+        ))
+    return inputs
+
+
+def _stream_copy_blocker(inputs: List[_SceneInput]) -> Optional[str]:
+    """
+    Checks whether the clips can be joined without re-encoding the video.
+
+    All clips must share codec, profile, resolution and frame rate, and every
+    clip must be at least as long as its narration (stream copy can cut a clip
+    but cannot hold its last frame).
+
+    Returns:
+        None when stream copy is possible, otherwise the reason it is not
+    """
+    reference = inputs[0].clip_format
+    for scene_input in inputs:
+        codec = scene_input.clip_format[0]
+        if codec not in STREAM_COPY_CODECS:
+            return f"Scene {scene_input.index+1}: codec {codec} cannot be stream copied"
+        if scene_input.clip_format != reference:
+            return f"Scene {scene_input.index+1}: clip format {scene_input.clip_format} differs from {reference}"
+        if scene_input.narration_duration > scene_input.clip_duration + DURATION_TOLERANCE:
+            return (
+                f"Scene {scene_input.index+1}: narration ({scene_input.narration_duration:.2f}s) "
+                f"is longer than clip ({scene_input.clip_duration:.2f}s)"
+            )
+    return None
+
+
+def _run_ffmpeg(args: List[str]):
+    """Runs ffmpeg with the given arguments, raising RuntimeError with its stderr on failure."""
+    from moviepy.config import FFMPEG_BINARY
+
+    command = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *args]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {stderr[-500:]}")
+
+
+def _concat_list_entry(path: str) -> str:
+    escaped = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def preview_output_path(output_file: str) -> str:
+    """Where the preview render of `output_file` is written (e.g. final_ai_video_preview.mp4)."""
+    root, extension = os.path.splitext(output_file)
+    return f"{root}{PREVIEW_SUFFIX}{extension or '.mp4'}"
+
+
+def _preview_frame_size(frame_size: Tuple[int, int]) -> Tuple[int, int]:
+    """`frame_size` scaled down to PREVIEW_MAX_HEIGHT (even dimensions, as x264 requires)."""
+    scale = min(1.0, PREVIEW_MAX_HEIGHT / frame_size[1]) if frame_size[1] else 1.0
+    return (max(2, int(frame_size[0] * scale) // 2 * 2), max(2, int(frame_size[1] * scale) // 2 * 2))
+
+
+def _segment_key(scene_input: _SceneInput, render_mode: str, frame_size: Tuple[int, int]) -> str:
+    """Cache key covering everything that determines a rendered segment."""
+    fps = {RENDER_MODE_REENCODE: REENCODE_FPS, RENDER_MODE_PREVIEW: PREVIEW_FPS}.get(render_mode)
+    return ArtifactCache.make_key(
+        clip=ArtifactCache.file_digest(scene_input.video_path),
+        voiceover=ArtifactCache.file_digest(scene_input.voiceover),
+        duration=round(scene_input.narration_duration, 3),
+        audio=AUDIO_ENCODE_ARGS,
+        render_mode=render_mode,
+        frame_size=frame_size if fps else None,
+        fps=fps,
+        video=PREVIEW_VIDEO_ENCODE_ARGS if render_mode == RENDER_MODE_PREVIEW else None,
+        version=SEGMENT_FORMAT_VERSION,
+    )
+
+
+def _mux_segment(video_path: str, voiceover: str, duration: float, segment_path: str):
+    """Copies the video stream and adds the narration, cut to the narration length."""
+    _run_ffmpeg([
+        "-i", video_path,
+        "-i", voiceover,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy", *AUDIO_ENCODE_ARGS,
+        "-t", f"{duration:.3f}",
+        segment_path,
+    ])
+
+
+def _segment_workers() -> int:
+    return max(1, settings.RENDER_SEGMENT_WORKERS or os.cpu_count() or 1)
+
+
+def _segment_process_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for MoviePy re-encodes, whose frame compositing runs
+    in Python and would serialize on the GIL in threads.
+    """
+    global _segment_pool
+    with _segment_pool_lock:
+        if _segment_pool is None:
+            # spawn: the API process runs many threads, which makes fork unsafe
+            _segment_pool = ProcessPoolExecutor(
+                max_workers=_segment_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _segment_pool
+
+
+def segment_worker_pids() -> List[int]:
+    """PIDs of the running segment worker processes (none before the pool is first used)."""
+    with _segment_pool_lock:
+        pool = _segment_pool
+    # ProcessPoolExecutor keeps its workers by PID in _processes
+    return list(getattr(pool, "_processes", None) or {}) if pool else []
+
+
+def shutdown_segment_pool():
+    """Stops the segment worker processes (on API shutdown)."""
+    global _segment_pool
+    with _segment_pool_lock:
+        pool, _segment_pool = _segment_pool, None
+    if pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_reencoded_video(scene_input: _SceneInput, frame_size: Tuple[int, int], output_path: str, threads: Optional[int] = None):
+    """
+    Renders the clip with MoviePy at the common frame size and frame rate,
+    holding the last frame when the narration is longer than the clip.
+    """
+    from moviepy import CompositeVideoClip, VideoFileClip
+
+    # The reader holds an ffmpeg process and file handles until it is closed, so
+    # the clip is only open while this segment renders; its audio is never used
+    with VideoFileClip(scene_input.video_path, audio=False) as source:
+        video_clip = source.with_duration(scene_input.narration_duration)
+        if tuple(video_clip.size) != tuple(frame_size):
+            # Same result as concatenate_videoclips(method="compose"): centered on black
+            video_clip = CompositeVideoClip([video_clip.with_position("center")], size=frame_size)
+        try:
+            video_clip.write_videofile(
+                output_path,
+                fps=REENCODE_FPS,
+                codec="libx264",
+                audio=False,
+                threads=threads,
+                ffmpeg_params=["-pix_fmt", "yuv420p"],
+            )
+        finally:
+            video_clip.close()
+
+
+def _render_preview_segment(scene_input: _SceneInput, frame_size: Tuple[int, int], full_frame_size: Tuple[int, int], segment_path: str, threads: Optional[int] = None):
+    """
+    Renders a low-cost preview segment in a single ffmpeg pass: the clip is
+    scaled by the same factor as the frame, centered on black, resampled to
+    PREVIEW_FPS, its last frame held for the rest of the narration, and muxed
+    with the narration.
+    """
+    scale = frame_size[1] / full_frame_size[1] if full_frame_size[1] else 1.0
+    hold = max(0.0, scene_input.narration_duration - scene_input.clip_duration) + 1.0
+    video_filter = ",".join([
+        f"fps={PREVIEW_FPS}",
+        f"scale=trunc(iw*{scale:.6f}/2)*2:trunc(ih*{scale:.6f}/2)*2",
+        f"pad={frame_size[0]}:{frame_size[1]}:(ow-iw)/2:(oh-ih)/2:black",
+        f"tpad=stop_mode=clone:stop_duration={hold:.3f}",
+        "setsar=1",
+    ])
+    _run_ffmpeg([
+        "-i", scene_input.video_path,
+        "-i", scene_input.voiceover,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-vf", video_filter,
+        *PREVIEW_VIDEO_ENCODE_ARGS, *AUDIO_ENCODE_ARGS,
+        *(["-threads", str(threads)] if threads else []),
+        "-t", f"{scene_input.narration_duration:.3f}",
+        segment_path,
+    ])
+
+
+def _build_segment(scene_input: _SceneInput, render_mode: str, frame_size: Tuple[int, int], segment_path: str, threads: Optional[int] = None) -> bool:
+    """
+    Writes the scene's segment to `segment_path`, from the segment cache when possible.
+    `threads` caps the encoder threads so parallel segments don't oversubscribe the CPU.
+
+    Returns:
+        True when the segment was reused from the cache
+    """
+    render_size = _preview_frame_size(frame_size) if render_mode == RENDER_MODE_PREVIEW else frame_size
+    key = _segment_key(scene_input, render_mode, render_size)
+    if segment_cache.get(key, segment_path):
+        return True
+
+    if render_mode == RENDER_MODE_STREAM_COPY:
+        _mux_segment(scene_input.video_path, scene_input.voiceover, scene_input.narration_duration, segment_path)
+    elif render_mode == RENDER_MODE_PREVIEW:
+        _render_preview_segment(scene_input, render_size, frame_size, segment_path, threads)
+    else:
+        video_only_path = f"{os.path.splitext(segment_path)[0]}_video.mp4"
+        _render_reencoded_video(scene_input, frame_size, video_only_path, threads)
+        _mux_segment(video_only_path, scene_input.voiceover, scene_input.narration_duration, segment_path)
+        os.remove(video_only_path)
+
+    segment_cache.put(key, segment_path)
+    return False
+
+
+def _splice_segments(segment_paths: List[str], output_file: str, work_dir: str, bg_music_path=None, progress=None):
+    """Joins the segments with the concat demuxer and mixes in the optional background music."""
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.writelines(_concat_list_entry(path) for path in segment_paths)
+
+    print(f"\n Concatenating {len(segment_paths)} segments...")
+    has_music = bg_music_path and os.path.exists(bg_music_path)
+    concat_path = os.path.join(work_dir, "concat.mp4") if has_music else output_file
+    _run_ffmpeg([
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-c", "copy", "-movflags", "+faststart",
+        concat_path,
+    ])
+
+    if has_music:
+        print(f"  -> Adding background music: {bg_music_path}")
+        report_progress(progress, "assembly", message="Mixing background music")
+        _run_ffmpeg([
+            "-i", concat_path,
+            "-i", bg_music_path,
+            "-filter_complex", f"[1:a]volume={BG_MUSIC_VOLUME}[bg];[0:a][bg]amix=inputs=2:duration=first:normalize=0[aout]",
+            "-map", "0:v:0", "-map", "[aout]",
+            "-c:v", "copy", *AUDIO_ENCODE_ARGS,
+            "-movflags", "+faststart",
+            output_file,
+        ])
+
+
+def _render_segments(inputs: List[_SceneInput], render_mode: str, output_file: str, bg_music_path=None, progress=None) -> int:
+    """
+    Builds (or reuses) every scene segment and splices them into `output_file`.
+
+    Segments are independent, so they are built in parallel on up to
+    settings.RENDER_SEGMENT_WORKERS workers (default: one per core): MoviePy
+    re-encodes on the shared segment process pool, ffmpeg-only segments
+    (stream copy, preview) on threads, as ffmpeg already runs in its own process.
+    The render then takes about as long as its slowest scene.
+
+    Returns:
+        Number of segments reused from the segment cache
+    """
+    # Re-encoded segments share the largest clip size, like the compose concatenation did
+    frame_size = (max(s.clip_size[0] for s in inputs), max(s.clip_size[1] for s in inputs))
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = min(_segment_workers(), len(inputs))
+    # Split the cores between the encoders running at once
+    encoder_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with tempfile.TemporaryDirectory(prefix="assembly_", dir=output_dir) as work_dir:
+        segment_paths = [os.path.join(work_dir, f"segment_{position:04d}.mp4") for position in range(len(inputs))]
+        reused = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment") as thread_pool:
+            executor = _segment_process_pool() if render_mode == RENDER_MODE_REENCODE and workers > 1 else thread_pool
+            futures = {}
+            for position, scene_input in enumerate(inputs):
+                print(f"[{position+1}/{len(inputs)}] Adding scene: {scene_input.scene} (duration: {scene_input.narration_duration:.2f}s)")
+                future = executor.submit(_build_segment, scene_input, render_mode, frame_size, segment_paths[position], encoder_threads)
+                futures[future] = scene_input
+
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    scene_input = futures[future]
+                    from_cache = future.result()
+                    reused += from_cache
+                    report_progress(
+                        progress,
+                        "assembly",
+                        scene_index=scene_input.index,
+                        scene=scene_input.scene,
+                        percent=done / len(inputs) * 90,
+                        message="Segment reused" if from_cache else "Segment rendered",
+                    )
+            except BaseException:
+                # Running segments still write into work_dir: cancel the rest and wait before it is removed
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise
+
+        _splice_segments(segment_paths, output_file, work_dir, bg_music_path, progress)
+    return reused
+
+
+def assemble_final_video(scenes_with_voiceovers: List[VideoWithVoiceoverResponse], output_file="final_ai_video.mp4", bg_music_path=None, progress=None, preview: bool = False) -> FinalVideoResponse:
+    """
+    Assemble final video automatically:
+    - Uses AI-generated video clips
+    - Synchronizes TTS voiceovers
+    - Adds background music (optional)
+
+    Every scene becomes a segment (clip + narration) that is cached by its
+    inputs, so re-assembling after a scene was regenerated only renders that
+    scene again. When all clips share codec, resolution and frame rate the
+    segments copy the clip's video stream; otherwise they are re-encoded with
+    MoviePy to a common format. Segments are always joined by stream copy.
+    `progress` is an optional callback receiving per-scene progress events.
+
+    With `preview`, a quick draft is written to preview_output_path(output_file)
+    instead: clips that can be stream copied still are (nothing is cheaper),
+    otherwise segments are encoded by ffmpeg at PREVIEW_MAX_HEIGHT, PREVIEW_FPS
+    and the ultrafast preset. The full-quality output is left untouched.
+
+    Clip readers are only open while their segment renders and are always
+    closed; the peak memory and open handles of the render are reported in
+    `resources`.
+
+    Returns:
+        FinalVideoResponse with the output path and the render mode that was used
+    """
+    if preview:
+        output_file = preview_output_path(output_file)
+    print(f"\n Starting {'Preview' if preview else 'Final'} Video Assembly (Video Clips + Narration) ---")
+    report_progress(progress, "assembly", "started", percent=0)
+
+    scenes, skipped_scenes = _collect_scenes(scenes_with_voiceovers, progress)
+    inputs = _probe_scenes(scenes)
+
+    with RenderResourceMonitor(shared_workers=segment_worker_pids) as monitor:
+        fallback_reason = _stream_copy_blocker(inputs)
+        if fallback_reason is None:
+            try:
+                reused = _render_segments(inputs, RENDER_MODE_STREAM_COPY, output_file, bg_music_path, progress)
+                render_mode = RENDER_MODE_STREAM_COPY
+            except RuntimeError as e:
+                fallback_reason = f"Stream copy failed: {e}"
+
+        if fallback_reason is not None:
+            render_mode = RENDER_MODE_PREVIEW if preview else RENDER_MODE_REENCODE
+            print(f" Re-encoding scenes ({render_mode}): {fallback_reason}")
+            report_progress(progress, "assembly", message=f"Re-encoding: {fallback_reason}")
+            reused = _render_segments(inputs, render_mode, output_file, bg_music_path, progress)
+    resources = monitor.report()
+
+    duration = sum(s.narration_duration for s in inputs)
+    print(f" Final video created successfully ({render_mode}, {reused}/{len(inputs)} segments reused): {output_file}")
+    print(f"   Total duration: {duration:.2f} seconds")
+    print(
+        f"   Resources: peak memory {resources.peak_memory_mb} MB, "
+        f"open fds {resources.open_fds_before} -> {resources.open_fds_after}, "
+        f"ffmpeg processes {resources.ffmpeg_processes_before} -> {resources.ffmpeg_processes_after}"
+    )
+    report_progress(progress, "assembly", "completed", percent=100, message=f"{output_file} ({render_mode})")
+
+    return FinalVideoResponse(
+        output_file=output_file,
+        render_mode=render_mode,
+        preview=preview,
+        duration=round(duration, 3),
+        scenes_rendered=len(inputs),
+        segments_reused=reused,
+        skipped_scenes=skipped_scenes,
+        fallback_reason=fallback_reason,
+        resources=resources,
+    )
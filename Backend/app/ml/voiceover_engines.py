@@ -0,0 +1,134 @@
+import abc
+import functools
+import os
+import shutil
+import subprocess
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+from app.ml.artifact_cache import ArtifactCache
+
+
+class VoiceoverEngine(abc.ABC):
+    """
+    Text-to-speech backend used for scene narration.
+
+    Subclasses write the narration to an audio file and describe their voice
+    settings, which become part of the narration audio cache key.
+    """
+
+    name = ""
+    # File extension of the audio the engine writes
+    extension = ".mp3"
+
+    def cache_parts(self) -> dict:
+        """Everything besides the text that determines the synthesized audio."""
+        return {}
+
+    @abc.abstractmethod
+    def synthesize(self, text: str, output_path: str):
+        """Writes the spoken `text` to `output_path`."""
+
+
+class GTTSEngine(VoiceoverEngine):
+    """Google Text-to-Speech (network, free, rate limited)."""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def __init__(self, language: str = "en", slow: bool = False):
+        self.language = language
+        self.slow = slow
+
+    def cache_parts(self) -> dict:
+        return {"lang": self.language, "slow": self.slow}
+
+    def synthesize(self, text: str, output_path: str):
+        from gtts import gTTS
+
+        tts = gTTS(text=text, lang=self.language, slow=self.slow)
+        tts.save(output_path)
+
+
+class PiperEngine(VoiceoverEngine):
+    """
+    Piper (https://github.com/rhasspy/piper): local, offline, CPU-only neural TTS.
+
+    Runs the `piper` executable once per narration, so concurrent syntheses
+    use separate processes and scale with the available cores. The voice model
+    and executable are checked up front: a missing one raises ValueError when
+    the engine is created, before any narration is hashed or synthesized.
+    """
+
+    name = "piper"
+    extension = ".wav"
+
+    def __init__(self, model_path: str, binary: str = "piper", speaker: Optional[int] = None, length_scale: float = 1.0, timeout: float = 120.0):
+        if not model_path or not os.path.isfile(model_path):
+            raise ValueError(f"Piper voice model not found: {model_path!r} (set PIPER_MODEL_PATH to a .onnx voice)")
+        binary_path = shutil.which(binary)
+        if not binary_path:
+            raise ValueError(f"Piper executable not found: {binary!r} (install piper or set PIPER_BINARY)")
+        self.model_path = model_path
+        self.binary = binary
+        self.binary_path = binary_path
+        self.speaker = speaker
+        self.length_scale = length_scale
+        self.timeout = timeout
+
+    @functools.cached_property
+    def _model_digest(self) -> str:
+        return ArtifactCache.file_digest(self.model_path)
+
+    def cache_parts(self) -> dict:
+        return {"model": self._model_digest, "speaker": self.speaker, "length_scale": self.length_scale}
+
+    def synthesize(self, text: str, output_path: str):
+        command = [self.binary_path, "--model", self.model_path, "--output_file", output_path, "--length_scale", str(self.length_scale)]
+        if self.speaker is not None:
+            command += ["--speaker", str(self.speaker)]
+
+        result = subprocess.run(
+            command,
+            input=text.encode("utf-8"),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=self.timeout,
+        )
+        if result.returncode != 0 or not os.path.exists(output_path):
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
+            raise Exception(f"Piper exited with {result.returncode}: {stderr[-500:]}")
+
+
+# Additional engines selectable by name, see register_voiceover_engine()
+_registered_engines: Dict[str, Callable[[], VoiceoverEngine]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_voiceover_engine(name: Optional[str] = None) -> VoiceoverEngine:
+    """
+    Returns the voiceover engine selected by `name`, defaulting to settings.VOICEOVER_ENGINE.
+    Raises ValueError for an unknown or misconfigured engine.
+    """
+    name = (name or settings.VOICEOVER_ENGINE).lower()
+    if name in _registered_engines:
+        return _registered_engines[name]()
+    if name == GTTSEngine.name:
+        return GTTSEngine(language=settings.TTS_LANGUAGE)
+    if name == PiperEngine.name:
+        return PiperEngine(
+            model_path=settings.PIPER_MODEL_PATH,
+            binary=settings.PIPER_BINARY,
+            speaker=settings.PIPER_SPEAKER,
+            length_scale=settings.PIPER_LENGTH_SCALE,
+        )
+    raise ValueError(f"Unknown voiceover engine: {name}")
+
+
+def register_voiceover_engine(name: str, factory: Callable[[], VoiceoverEngine]):
+    """
+    Makes the engine built by `factory` selectable as `name` through
+    settings.VOICEOVER_ENGINE or get_voiceover_engine(name), e.g. a local
+    stand-in in benchmarks.
+    """
+    _registered_engines[name.lower()] = factory
+    get_voiceover_engine.cache_clear()
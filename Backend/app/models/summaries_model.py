@@ -6,6 +6,8 @@ class Summaries(SQLModel,table=True):
     id:int| None=Field(default=None,primary_key=True)
     summary_text:str=Field(nullable=False)
     model_used:str=Field(nullable=False)
+    summary_mode:str=Field(nullable=False)
+    summarizer_version:str=Field(nullable=False)
     created_at:datetime = Field(default_factory=datetime.now)
-    video_session_id:int = Field(foreign_key="video_sessions.id")
+    video_session_id:int = Field(foreign_key="video_sessions.id",index=True)
     
\ No newline at end of file
@@ -1,20 +1,22 @@
 from sqlmodel import SQLModel ,Field,Relationship
 from datetime import datetime
-from typing import Optional,Literal
+from typing import Optional
 from app.models.user_model import User
 
 class VideoSessions(SQLModel,table=True):
     __tablename__ ='video_sessions'
 
     id: int | None=Field(default=None,primary_key=True)
-    user_id: int = Field(foreign_key="users.id")
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id")
     
+    video_id:str = Field(index=True,nullable=False)
     youtube_url:str = Field(nullable=False)
-    title:str
+    title:Optional[str] = None
     transcript_text:str = Field(nullable=False)
-    status:Literal["PENDING",'PROCESSING','COMPLETED',"FAILED"]
+    # One of "PENDING", "PROCESSING", "COMPLETED", "FAILED"
+    status:str = Field(default="PENDING")
     created_at:datetime = Field(default_factory=datetime.now)
     updated_at:Optional[datetime]=None
 
 
-    user: Optional[User]=Relationship(back_populates='video_sessions')
\ No newline at end of file
+    user: Optional[User]=Relationship()
\ No newline at end of file
@@ -11,6 +11,17 @@ class StoryListResponse(BaseModel):
     scenes: List[StoryGeneratorResponse]
 
 
+class FailedSceneRegeneration(BaseModel):
+    index: int = Field(..., description="Index of the scene that could not be regenerated (0-based)")
+    scene: Optional[str] = Field(default=None, description="Title of the scene, if the index exists")
+    error: str = Field(..., description="Why regeneration failed")
+
+
+class RegeneratedScenesResponse(StoryListResponse):
+    regenerated_indices: List[int] = Field(default_factory=list, description="Indices of the scenes that were regenerated")
+    failed_scenes: List[FailedSceneRegeneration] = Field(default_factory=list, description="Requested scenes that kept their previous version")
+
+
 class ImageGeneratorResponse(BaseModel):
     scene: str = Field(..., description="The title of the scene")
     narration: str = Field(..., description="The creative narration or dialogue for this scene")
@@ -36,3 +47,23 @@ class VideoWithVoiceoverResponse(BaseModel):
     video_path: Optional[str] = Field(default=None, description="Local path of the generated video clip")
     voiceover: Optional[str] = Field(default=None, description="Local path to the voiceover audio file")
 
+
+
+class RenderResourceReport(BaseModel):
+    peak_memory_mb: Optional[float] = Field(default=None, description="Peak resident memory during the render, including the ffmpeg and segment worker processes it started (sampled)")
+    open_fds_before: Optional[int] = Field(default=None, description="Open file descriptors of the rendering process before the render (process-wide, includes concurrent renders)")
+    open_fds_after: Optional[int] = Field(default=None, description="Open file descriptors of the rendering process after the render (process-wide, includes concurrent renders)")
+    ffmpeg_processes_before: Optional[int] = Field(default=None, description="ffmpeg child processes already running when the render started (e.g. other renders)")
+    ffmpeg_processes_after: Optional[int] = Field(default=None, description="ffmpeg processes started during the render and still running after it (leaked readers)")
+
+
+class FinalVideoResponse(BaseModel):
+    output_file: str = Field(..., description="Path of the assembled final video")
+    render_mode: str = Field(..., description="'stream_copy' when clips were joined without re-encoding, otherwise 'reencode' ('preview' for preview renders)")
+    preview: bool = Field(default=False, description="Whether this is a reduced-quality preview render")
+    duration: float = Field(..., description="Total duration of the final video in seconds")
+    scenes_rendered: int = Field(..., description="Number of scenes included in the final video")
+    segments_reused: int = Field(default=0, description="Scene segments taken from the segment cache instead of being rendered")
+    skipped_scenes: List[str] = Field(default_factory=list, description="Scenes left out because their clip or voiceover was missing")
+    fallback_reason: Optional[str] = Field(default=None, description="Why the stream-copy fast path could not be used")
+    resources: Optional[RenderResourceReport] = Field(default=None, description="Peak memory and open handles of the render")
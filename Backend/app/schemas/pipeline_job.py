@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, Literal
+
+
+class PipelineJobStatus(BaseModel):
+    job_id: str = Field(..., description="Identifier returned when the job was submitted")
+    status: Literal["QUEUED", "RUNNING", "COMPLETED", "FAILED"] = Field(default="QUEUED", description="Current job state")
+    stage: Optional[str] = Field(default=None, description="Pipeline stage currently running")
+    video_id: str = Field(..., description="YouTube video ID")
+    run_id: Optional[str] = Field(default=None, description="Checkpoint run id; pass it as run_id (or resume the job) to continue a failed run")
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = Field(default=None, description="Failure reason when status is FAILED")
+    result: Optional[dict] = Field(default=None, description="Pipeline output when status is COMPLETED")
+    llm_metrics: Optional[dict] = Field(default=None, description="LLM call statistics of this job (tokens, prompt size, latency, parse results)")
+
+
+class ProgressEvent(BaseModel):
+    job_id: str = Field(..., description="Job the event belongs to")
+    stage: str = Field(..., description="Pipeline stage, e.g. images, videos, voiceovers, assembly")
+    status: Literal["started", "progress", "completed", "failed"] = Field(default="progress", description="What happened")
+    scene_index: Optional[int] = Field(default=None, description="0-based scene index for per-scene events")
+    scene: Optional[str] = Field(default=None, description="Scene title for per-scene events")
+    percent: Optional[float] = Field(default=None, description="Stage completion percentage")
+    elapsed: float = Field(..., description="Seconds since the job started")
+    message: Optional[str] = Field(default=None, description="Details, e.g. the failure reason")
+    timestamp: datetime = Field(default_factory=datetime.now)
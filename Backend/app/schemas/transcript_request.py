@@ -1,9 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 # ===== Request Models =====
 class VideoRequest(BaseModel):
     videoId: str = Field(..., description="YouTube video ID")
+    summary_mode: Literal["refine", "map_reduce"] = Field(default="refine", description="Summarization strategy: sequential 'refine' or concurrent 'map_reduce'")
 
 
 class StoryRequest(BaseModel):
@@ -13,6 +14,7 @@ class StoryRequest(BaseModel):
 class ImageRequest(BaseModel):
     story_data: List[dict] = Field(..., description="List of story scenes")
     output_dir: Optional[str] = Field(default="generated_images", description="Output directory for images")
+    bypass_cache: bool = Field(default=False, description="Call the image provider even if an identical prompt is cached")
 
 
 class VideoClipRequest(BaseModel):
@@ -29,11 +31,14 @@ class VideoAssembleRequest(BaseModel):
     scenes_with_voiceovers: List[dict] = Field(..., description="List of scenes with video and voiceover paths")
     bg_music_path: Optional[str] = Field(default=None, description="Path to background music file")
     output_file: Optional[str] = Field(default="final_ai_video.mp4", description="Output filename")
+    preview: bool = Field(default=False, description="Render a quick low-resolution preview to '<output_file>_preview.mp4' instead of the full-quality video")
 
 
 class CompletePipelineRequest(BaseModel):
     videoId: str = Field(..., description="YouTube video ID")
-    output_video_name: Optional[str] = Field(default="final_ai_video.mp4", description="Output video filename")
+    output_video_name: Optional[str] = Field(default="final_ai_video.mp4", description="Output video filename; written to generated_videos/<run_id>/")
+    summary_mode: Literal["refine", "map_reduce"] = Field(default="refine", description="Summarization strategy: sequential 'refine' or concurrent 'map_reduce'")
+    run_id: Optional[str] = Field(default=None, description="Checkpoint run id of an earlier run to resume; its finished story and scene stages are reused")
 
 
 # ===== REGENERATION Request Models =====
@@ -52,6 +57,13 @@ class RegenerateSpecificScenesRequest(BaseModel):
 class RegenerateSingleImageRequest(BaseModel):
     scene_data: dict = Field(..., description="Scene data with prompts")
     output_dir: Optional[str] = Field(default="generated_images", description="Output directory")
+    bypass_cache: bool = Field(default=True, description="Generate a fresh variation instead of reusing the cached image for this prompt")
+
+
+class BatchRegenerateImagesRequest(BaseModel):
+    story_data: List[dict] = Field(..., description="List of story scenes")
+    output_dir: Optional[str] = Field(default="generated_images", description="Output directory for images")
+    bypass_cache: bool = Field(default=True, description="Generate fresh variations; set to false to reuse cached images of unchanged prompts")
 
 
 class RegenerateSingleVideoRequest(BaseModel):
@@ -62,6 +74,7 @@ class RegenerateSingleVideoRequest(BaseModel):
 class RegenerateSingleVoiceoverRequest(BaseModel):
     scene_data: dict = Field(..., description="Scene data with narration")
     output_dir: Optional[str] = Field(default="voice_overs", description="Output directory")
+    bypass_cache: bool = Field(default=False, description="Synthesize again even if this narration is cached")
 
 
 class UpdateSceneRequest(BaseModel):
@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+from sqlmodel import Session
+from app.core.config import settings
+from app.db.session import engine
+from app.ml.artifact_cache import ArtifactCache
+from app.ml.model_connect import story_generator, complete_video_pipeline
+from app.ml.pipeline_checkpoint import PipelineCheckpoint
+from app.schemas.ml_process_response import StoryListResponse
+from app.services.transcript_cache import cached_transcript_summary
+from app.schemas.api_response import TranscriptUploadResponse
+from app.schemas.pipeline_job import PipelineJobStatus, ProgressEvent
+from app.services.progress import progress_bus
+from app.ml.llm_metrics import collect_llm_metrics
+from app.schemas.transcript_request import CompletePipelineRequest
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_pipeline(session: Session, request: CompletePipelineRequest, render_executor=None, progress=None):
+    """
+    Runs transcript -> story -> images -> videos -> voiceovers -> final video for one YouTube video.
+
+    Progress is checkpointed under request.run_id (a new id when not given):
+    running again with the same run_id reuses the story and every scene stage
+    that already finished, and only redoes what failed or is missing.
+
+    Args:
+        session: Database session used for the transcript/summary cache
+        request: Pipeline parameters
+        render_executor: Optional executor the final MoviePy render is submitted to
+        progress: Optional progress callback (see ProgressBus.reporter) passed to every stage
+
+    Returns:
+        Dict with the run id, summary, scene count and final video path, or a
+        TranscriptUploadResponse when no transcript is available
+    """
+    def report(stage: str, status: str, **details):
+        if progress:
+            progress(stage=stage, status=status, **details)
+
+    logger.info("Step 1: Generating transcript...")
+    report("transcript", "started")
+    summary = cached_transcript_summary(session, request.videoId, summary_mode=request.summary_mode)
+    if isinstance(summary, TranscriptUploadResponse):
+        report("transcript", "failed", message=summary.message)
+        return summary
+    report("transcript", "completed")
+
+    run_id = request.run_id or uuid.uuid4().hex
+    checkpoint = PipelineCheckpoint.for_run(run_id)
+
+    logger.info("Step 2: Generating story...")
+    report("story", "started")
+    # The story is sampled, so a resumed run must reuse it for its scene checkpoints to match
+    story_key = ArtifactCache.make_key(summary=summary)
+    stored_story = checkpoint.get_value("story", story_key)
+    if stored_story:
+        story = StoryListResponse(**stored_story)
+        report("story", "completed", message=f"{len(story.scenes)} scenes (from checkpoint)")
+    else:
+        story = story_generator(summary)
+        checkpoint.put_value("story", story_key, story.model_dump())
+        report("story", "completed", message=f"{len(story.scenes)} scenes")
+
+    logger.info("Step 3: Running complete video pipeline...")
+    final_video = complete_video_pipeline(
+        story_scenes=story.scenes,
+        output_video_name=request.output_video_name,
+        render_executor=render_executor,
+        progress=progress,
+        checkpoint=checkpoint,
+        run_id=checkpoint.run_id,
+    )
+
+    return {
+        "run_id": checkpoint.run_id,
+        "summary": summary,
+        "scenes_count": len(story.scenes),
+        "final_video": final_video
+    }
+
+
+class PipelineJobManager:
+    """
+    Runs complete-pipeline jobs in the background and keeps track of their status.
+
+    Pipelines execute on a dedicated thread pool (they mostly wait on remote
+    providers), while the CPU-heavy MoviePy render is handed to a separate
+    process pool. Job state is kept in memory, so status is only visible on
+    the API worker process that accepted the job.
+    """
+
+    def __init__(self, max_workers: int, render_workers: int, max_history: int):
+        self._max_workers = max_workers
+        self._render_workers = render_workers
+        self._max_history = max_history
+        self._jobs: "OrderedDict[str, PipelineJobStatus]" = OrderedDict()
+        self._requests: Dict[str, CompletePipelineRequest] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._render_executor: Optional[ProcessPoolExecutor] = None
+
+    def _executors(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="pipeline-job")
+                # spawn: the API process runs many threads, which makes fork unsafe
+                self._render_executor = ProcessPoolExecutor(
+                    max_workers=self._render_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor, self._render_executor
+
+    def submit(self, request: CompletePipelineRequest) -> PipelineJobStatus:
+        job_id = uuid.uuid4().hex
+        # Without an explicit run id the job id doubles as the checkpoint run id; the job
+        # reports the name the checkpoint is stored under, so resuming with it finds the run
+        run_id = PipelineCheckpoint.safe_run_id(request.run_id) if request.run_id else job_id
+        request = request.model_copy(update={"run_id": run_id})
+        job = PipelineJobStatus(job_id=job_id, video_id=request.videoId, run_id=request.run_id)
+        executor, _ = self._executors()
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._requests[job.job_id] = request
+            self._prune()
+        executor.submit(self._run, job.job_id, request)
+        logger.info(f"Queued pipeline job {job.job_id} for video ID: {request.videoId}")
+        return job.model_copy()
+
+    def resume(self, job_id: str) -> Optional[PipelineJobStatus]:
+        """
+        Queues a new job continuing the checkpointed run of a failed job.
+        Returns None when the job is unknown; raises ValueError unless it failed.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            request = self._requests.get(job_id)
+        if job is None or request is None:
+            return None
+        if job.status != "FAILED":
+            raise ValueError(f"Only failed jobs can be resumed (job is {job.status.lower()})")
+        logger.info(f"Resuming run {request.run_id} of pipeline job {job_id}")
+        return self.submit(request)
+
+    def get(self, job_id: str) -> Optional[PipelineJobStatus]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def shutdown(self):
+        with self._lock:
+            executor, render_executor = self._executor, self._render_executor
+            self._executor = self._render_executor = None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if render_executor:
+            render_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                for key, value in changes.items():
+                    setattr(job, key, value)
+
+    def _on_progress(self, job_id: str, event: ProgressEvent):
+        if event.status == "started":
+            self._update(job_id, stage=event.stage)
+
+    def _prune(self):
+        # Drop the oldest finished jobs once the history limit is exceeded
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("COMPLETED", "FAILED")]
+        for job_id in finished[:max(0, len(self._jobs) - self._max_history)]:
+            del self._jobs[job_id]
+            self._requests.pop(job_id, None)
+            progress_bus.forget(job_id)
+
+    def _run(self, job_id: str, request: CompletePipelineRequest):
+        self._update(job_id, status="RUNNING", started_at=datetime.now())
+        logger.info(f"Starting pipeline job {job_id} for video ID: {request.videoId}")
+        progress = progress_bus.reporter(job_id, on_event=lambda event: self._on_progress(job_id, event))
+        progress(stage="pipeline", status="started")
+        try:
+            _, render_executor = self._executors()
+            with Session(engine) as session, collect_llm_metrics() as job_llm_metrics:
+                try:
+                    result = run_pipeline(
+                        session,
+                        request,
+                        render_executor=render_executor,
+                        progress=progress,
+                    )
+                finally:
+                    self._update(job_id, llm_metrics=job_llm_metrics.snapshot())
+            if isinstance(result, TranscriptUploadResponse):
+                self._update(job_id, status="FAILED", error=result.message, finished_at=datetime.now())
+                progress(stage="pipeline", status="failed", message=result.message)
+                return
+            self._update(job_id, status="COMPLETED", result=result, finished_at=datetime.now())
+            progress(stage="pipeline", status="completed", percent=100, message=result["final_video"])
+            logger.info(f"Pipeline job {job_id} finished: {result['final_video']}")
+        except Exception as e:
+            logger.error(f"Pipeline job {job_id} failed: {str(e)}")
+            self._update(job_id, status="FAILED", error=str(e), finished_at=datetime.now())
+            progress(stage="pipeline", status="failed", message=str(e))
+        finally:
+            progress_bus.close(job_id)
+
+
+pipeline_jobs = PipelineJobManager(
+    max_workers=settings.PIPELINE_JOB_WORKERS,
+    render_workers=settings.PIPELINE_RENDER_WORKERS,
+    max_history=settings.PIPELINE_JOB_HISTORY,
+)
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from app.schemas.pipeline_job import ProgressEvent
+
+
+class ProgressBus:
+    """
+    In-process publish/subscribe bus for pipeline progress events.
+
+    Pipeline stages publish from worker threads; subscribers are asyncio
+    consumers (the SSE endpoint). Every event is kept per job so late
+    subscribers first receive the history, then live events until the job
+    is closed.
+    """
+
+    def __init__(self, max_events_per_job: int = 2000):
+        self._max_events_per_job = max_events_per_job
+        self._lock = threading.Lock()
+        self._history: Dict[str, List[ProgressEvent]] = {}
+        self._closed: Set[str] = set()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def reporter(self, job_id: str, on_event: Optional[Callable[[ProgressEvent], None]] = None):
+        """
+        Returns a progress callback for the ML pipeline functions that publishes to this job.
+        `on_event` is additionally called with every event (e.g. to update job status).
+        """
+        started = time.monotonic()
+
+        def report(stage: str, status: str = "progress", scene_index: Optional[int] = None, scene: Optional[str] = None, percent: Optional[float] = None, message: Optional[str] = None):
+            event = ProgressEvent(
+                job_id=job_id,
+                stage=stage,
+                status=status,
+                scene_index=scene_index,
+                scene=scene,
+                percent=round(percent, 1) if percent is not None else None,
+                elapsed=round(time.monotonic() - started, 3),
+                message=message,
+            )
+            if on_event:
+                on_event(event)
+            self.publish(event)
+
+        return report
+
+    def publish(self, event: ProgressEvent):
+        with self._lock:
+            history = self._history.setdefault(event.job_id, [])
+            history.append(event)
+            if len(history) > self._max_events_per_job:
+                del history[0]
+            subscribers = list(self._subscribers.get(event.job_id, []))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def close(self, job_id: str):
+        """Marks a job as finished; subscribers receive the remaining events and then stop."""
+        with self._lock:
+            self._closed.add(job_id)
+            subscribers = self._subscribers.pop(job_id, [])
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    def forget(self, job_id: str):
+        """Drops the stored history of a job."""
+        self.close(job_id)
+        with self._lock:
+            self._history.pop(job_id, None)
+            self._closed.discard(job_id)
+
+    async def subscribe(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[ProgressEvent]]:
+        """
+        Yields the job's past events followed by live ones until the job is closed.
+        Yields None every `heartbeat` seconds without events so callers can keep the connection alive.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            backlog = list(self._history.get(job_id, []))
+            closed = job_id in self._closed
+            if not closed:
+                self._subscribers.setdefault(job_id, []).append((loop, queue))
+
+        try:
+            for event in backlog:
+                yield event
+            if closed:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id, [])
+                if (loop, queue) in subscribers:
+                    subscribers.remove((loop, queue))
+
+
+progress_bus = ProgressBus()
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Session, select
+from app.models.videoSessions_model import VideoSessions
+from app.models.summaries_model import Summaries
+from app.ml.model_connect import (
+    fetch_transcript,
+    summarize_transcript,
+    SUMMARY_MODE_REFINE,
+    SUMMARY_MODEL,
+    SUMMARIZER_VERSION,
+)
+from app.schemas.api_response import TranscriptUploadResponse
+
+
+def get_or_fetch_transcript(session: Session, video_id: str) -> Optional[VideoSessions]:
+    """
+    Returns the stored transcript for a YouTube video, fetching and persisting it on first use.
+    Returns None, without storing anything, when the video's transcript is empty.
+    """
+    video_session = session.exec(
+        select(VideoSessions)
+        .where(VideoSessions.video_id == video_id)
+        .order_by(VideoSessions.created_at.desc())
+    ).first()
+    # Sessions with an empty transcript are not reused (nor stored any more)
+    if video_session and video_session.transcript_text.strip():
+        print(f"Transcript cache hit for video {video_id}")
+        return video_session
+
+    transcript = fetch_transcript(video_id)
+    if not transcript.strip():
+        return None
+    video_session = VideoSessions(
+        video_id=video_id,
+        youtube_url=f"https://www.youtube.com/watch?v={video_id}",
+        transcript_text=transcript,
+        status="PROCESSING",
+    )
+    session.add(video_session)
+    session.commit()
+    session.refresh(video_session)
+    return video_session
+
+
+def get_cached_summary(session: Session, video_session_id: int, summary_mode: str):
+    """Returns the stored summary for a video session produced by the current summarizer, if any."""
+    return session.exec(
+        select(Summaries)
+        .where(Summaries.video_session_id == video_session_id)
+        .where(Summaries.summary_mode == summary_mode)
+        .where(Summaries.model_used == SUMMARY_MODEL)
+        .where(Summaries.summarizer_version == SUMMARIZER_VERSION)
+        .order_by(Summaries.created_at.desc())
+    ).first()
+
+
+def cached_transcript_summary(session: Session, video_id: str, summary_mode: str = SUMMARY_MODE_REFINE):
+    """
+    Cached version of transcript_generator().
+
+    The raw transcript is stored per videoId and each summary per
+    (videoId, summary mode, model, summarizer version), so repeated requests
+    for the same video skip both the YouTube fetch and the Gemini calls.
+
+    Returns:
+        The summary text, or a TranscriptUploadResponse describing the failure
+    """
+    from youtube_transcript_api import TranscriptsDisabled
+
+    try:
+        video_session = get_or_fetch_transcript(session, video_id)
+        if video_session is None:
+            return TranscriptUploadResponse(message="NO CONTENT FOUND OR NO TRANSCRIPT FOUND", status=404, success=False)
+
+        cached = get_cached_summary(session, video_session.id, summary_mode)
+        if cached:
+            print(f"Summary cache hit for video {video_id} ({summary_mode})")
+            return cached.summary_text
+
+        summary_text = summarize_transcript(video_session.transcript_text, summary_mode)
+
+        session.add(Summaries(
+            summary_text=summary_text,
+            model_used=SUMMARY_MODEL,
+            summary_mode=summary_mode,
+            summarizer_version=SUMMARIZER_VERSION,
+            video_session_id=video_session.id,
+        ))
+        video_session.status = "COMPLETED"
+        video_session.updated_at = datetime.now()
+        session.add(video_session)
+        session.commit()
+        return summary_text
+    except TranscriptsDisabled:
+        return TranscriptUploadResponse(message="NO CONTENT FOUND OR NO TRANSCRIPT FOUND", status=404, success=False)
+    except Exception as e:
+        session.rollback()
+        print(f"Error generating cached summary for {video_id}: {e}")
+        return TranscriptUploadResponse(message="Video is Not Available", status=404, success=False)
@@ -1,7 +1,3 @@
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-
-
 def summary_prompt(chunk_text: str, previous_summary: str = "") -> str:
     return f"""
 You are an expert summarizer and narrative enhancer. I will provide a transcript of a video in multiple chunks. 
@@ -52,6 +48,71 @@ Updated, context-aware comprehensive summary:
 
 
 
+def chunk_summary_prompt(chunk_text: str, chunk_index: int, total_chunks: int) -> str:
+    return f"""
+You are an expert summarizer and narrative enhancer. You are given ONE part of a longer video transcript 
+(part {chunk_index} of {total_chunks}). Other parts are summarized separately and merged later, so focus only on this part.
+
+# 🎯 Your objectives:
+1. Keep every key point, fact, name and event from this part, in the order they happen.
+2. Preserve the natural tone of the content (e.g., horror, documentary, sci-fi, motivational) — subtly enhance 
+   suspense, rhythm or clarity, but do *not* invent events or change the genre.
+3. Do not write an introduction or conclusion for the whole video — this part may start or end mid-story.
+4. Do not use Markdown or headings. Return plain prose suitable for a later merge step.
+
+Transcript Part {chunk_index} of {total_chunks}:
+{chunk_text}
+
+Faithful, vivid summary of this part:
+"""
+
+
+def combine_summaries_prompt(summaries: list) -> str:
+    numbered = "\n\n".join(f"Section {i}:\n{text}" for i, text in enumerate(summaries, 1))
+    return f"""
+You are an expert summarizer and narrative enhancer. Below are consecutive section summaries of the same video, 
+in chronological order. Merge them into a **single comprehensive summary**.
+
+# 🎯 Your objectives:
+1. Keep every key point, fact, and the original order of events across all sections.
+2. Remove repetition caused by overlapping sections, and add smooth transitions between them.
+3. Keep the natural theme and emotional tone of the content — vivid and cinematic, but faithful.
+4. Do not use Markdown or headings. The result will later be converted into a cinematic script 
+   for an AI video generation pipeline.
+
+{numbered}
+
+Merged, context-aware comprehensive summary:
+"""
+
+
+def regenerate_scene_prompt(video_summary: str, scene) -> str:
+    return f"""
+Based on the video summary below, regenerate the scene titled "{scene.scene}".
+
+Video Summary:
+{video_summary}
+
+Current scene that needs improvement:
+- Scene: {scene.scene}
+- Narration: {scene.narration}
+- Visual Cues: {scene.visual_cues}
+
+Please provide a FRESH and IMPROVED version of this scene with:
+1. A compelling narration
+2. Detailed visual cues
+3. AI-ready image generation prompts
+
+Return ONLY a valid JSON object with this structure:
+{{
+    "scene": "Scene title",
+    "narration": "Detailed narration text",
+    "visual_cues": "Detailed visual description",
+    "prompts": ["Image generation prompt"]
+}}
+"""
+
+
 def image_generator_prompt(video_summary: str, pydanticParser, previous_script: str = ""):
     template = """
 You are an expert **cinematic storyteller**, **film director**, and **AI visual prompt designer**.
@@ -181,6 +242,8 @@ Return the script as a **JSON array**, one object per scene:
 Generate the **final cinematic storytelling script** in 8–10 vivid, emotionally charged scenes — each with narration, detailed visual cues, and a cinematic AI image prompt.
 """
 
+    from langchain_core.prompts import PromptTemplate
+
     prompt = PromptTemplate(
         template=template,
         input_variables=['video_summary', 'previous_script'],
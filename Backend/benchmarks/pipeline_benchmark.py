@@ -0,0 +1,498 @@
+"""
+End-to-end pipeline benchmark with local fake providers.
+
+Gemini, Nebius (images + downloads), Veo and the voiceover engine are replaced
+by in-process stand-ins with configurable latency and failure distributions
+that return synthetic media (generated once with ffmpeg), so no provider is
+called and nothing is billed. The real pipeline code runs unchanged: the fakes
+are installed through the client registry's override() and a registered
+voiceover engine selected with VOICEOVER_ENGINE, so no application code is patched.
+
+Reports per-stage wall-clock time, the peak number of concurrent calls reached
+per provider, and peak memory. Run from the Backend directory with the usual
+environment (.env):
+
+    python benchmarks/pipeline_benchmark.py --scenes 8 --runs 3
+    python benchmarks/pipeline_benchmark.py --video-latency 6 --video-failure-rate 0.1 --distribution lognormal
+    python benchmarks/pipeline_benchmark.py --mode routes --route-clients 20
+    python benchmarks/pipeline_benchmark.py --reuse-workdir --runs 2   # second run with warm caches
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from contextlib import contextmanager
+from typing import List
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROVIDERS = ("llm", "image", "download", "video", "tts")
+
+
+class LatencyModel:
+    """Latency (seconds) and failure distribution of one fake provider."""
+
+    def __init__(self, mean: float, jitter: float, distribution: str, failure_rate: float, rng: random.Random):
+        self.mean = mean
+        self.jitter = jitter
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.distribution == "uniform":
+                return max(0.0, self._rng.uniform(self.mean * (1 - self.jitter), self.mean * (1 + self.jitter)))
+            if self.distribution == "lognormal" and self.mean > 0:
+                # Median at `mean`, long right tail like real provider latency
+                return self._rng.lognormvariate(0.0, self.jitter) * self.mean
+            return self.mean
+
+    def fails(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+
+class ProviderProbe:
+    """Records every call to a fake provider as a (start, end, failed) interval."""
+
+    def __init__(self, name: str, latency: LatencyModel):
+        self.name = name
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def record(self, start: float, end: float, failed: bool):
+        with self._lock:
+            self._calls.append((start, end, failed))
+
+    @contextmanager
+    def call(self):
+        """Sleeps for one sampled latency, then fails with the configured probability."""
+        start = time.perf_counter()
+        failed = self.latency.fails()
+        try:
+            time.sleep(self.latency.sample())
+            if failed:
+                raise RuntimeError(f"Injected {self.name} failure")
+            yield
+        finally:
+            self.record(start, time.perf_counter(), failed)
+
+    async def acall(self):
+        start = time.perf_counter()
+        failed = self.latency.fails()
+        try:
+            await asyncio.sleep(self.latency.sample())
+            if failed:
+                raise RuntimeError(f"Injected {self.name} failure")
+        finally:
+            self.record(start, time.perf_counter(), failed)
+
+    def reset(self):
+        with self._lock:
+            self._calls = []
+
+    def summary(self) -> dict:
+        with self._lock:
+            calls = list(self._calls)
+        # Sweep over start/end events for the highest number of overlapping calls
+        events = sorted([(start, 1) for start, _, _ in calls] + [(end, -1) for _, end, _ in calls])
+        in_flight = peak = 0
+        for _, delta in events:
+            in_flight += delta
+            peak = max(peak, in_flight)
+        latencies = [end - start for start, end, _ in calls]
+        return {
+            "calls": len(calls),
+            "failures": sum(1 for _, _, failed in calls if failed),
+            "peak_concurrency": peak,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        }
+
+
+# ===== Synthetic media =====
+def make_media(directory: str, clip_size: str, clip_seconds: float, variants: int) -> dict:
+    """
+    Renders the template image plus `variants` distinct clips and narrations
+    returned by the fake calls (distinct, so scenes don't share segment cache entries).
+    """
+    from moviepy.config import FFMPEG_BINARY
+
+    os.makedirs(directory, exist_ok=True)
+    media = {"image": os.path.join(directory, "image.png"), "clips": [], "audios": []}
+    commands = [["-f", "lavfi", "-i", f"color=c=navy:s={clip_size}", "-frames:v", "1", media["image"]]]
+    for i in range(variants):
+        clip = os.path.join(directory, f"clip{i}.mp4")
+        audio = os.path.join(directory, f"narration{i}.mp3")
+        commands.append(["-f", "lavfi", "-i", f"testsrc=size={clip_size}:rate=24", "-t", str(clip_seconds),
+                         "-vf", f"hue=h={i * 360 / variants}", "-c:v", "libx264", "-pix_fmt", "yuv420p", clip])
+        commands.append(["-f", "lavfi", "-i", f"sine=frequency={220 + 40 * i}:duration={clip_seconds}", "-c:a", "libmp3lame", audio])
+        media["clips"].append(clip)
+        media["audios"].append(audio)
+    for args in commands:
+        subprocess.run([FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *args], check=True)
+    return media
+
+
+# ===== Fake providers =====
+def fake_story(prompt: str, scenes: int) -> str:
+    # Deterministic per prompt, so identical inputs hit the image/audio caches like real reruns
+    tag = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    return json.dumps({"scenes": [
+        {
+            "scene": f"Scene {i + 1} {tag}",
+            "narration": f"Narration for scene {i + 1} of story {tag}.",
+            "visual_cues": f"Visual cues for scene {i + 1} of story {tag}",
+            "prompts": [f"Image prompt for scene {i + 1} of story {tag}"],
+        }
+        for i in range(scenes)
+    ]})
+
+
+def make_fake_chat_model(probe: ProviderProbe, scenes: int):
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    class FakeChatModel(ChatGoogleGenerativeAI):
+        """Answers every prompt with a story of `scenes` scenes; structured output runs through the real Gemini binding."""
+
+        def _result(self, messages) -> ChatResult:
+            content = fake_story(messages[-1].content, scenes)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            with probe.call():
+                return self._result(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await probe.acall()
+            return self._result(messages)
+
+    from app.ml.llm_callbacks import llm_metrics_handler
+
+    return FakeChatModel(model="benchmark-fake", google_api_key="benchmark", callbacks=[llm_metrics_handler])
+
+
+class FakeImages:
+    def __init__(self, probe: ProviderProbe):
+        self._probe = probe
+
+    def generate(self, model: str, prompt: str, **kwargs):
+        with self._probe.call():
+            return types.SimpleNamespace(data=[types.SimpleNamespace(url=f"https://images.invalid/{uuid.uuid4().hex}.png")])
+
+
+class FakeDownload:
+    """Stands in for the requests response (used as a context manager)."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size: int = 8192):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+
+class FakeHTTP:
+    def __init__(self, probe: ProviderProbe, image_path: str):
+        self._probe = probe
+        with open(image_path, "rb") as f:
+            self._content = f.read()
+
+    def get(self, url: str, **kwargs):
+        with self._probe.call():
+            return FakeDownload(self._content)
+
+
+class FakeVideo:
+    def __init__(self, clip_path: str):
+        self._clip_path = clip_path
+
+    def save(self, path: str):
+        shutil.copyfile(self._clip_path, path)
+
+
+class FakeOperation:
+    def __init__(self, name: str, ready_at: float, failed: bool, clip_path: str):
+        self.name = name
+        self.ready_at = ready_at
+        self.failed = failed
+        self.clip_path = clip_path
+
+    @property
+    def done(self) -> bool:
+        return time.perf_counter() >= self.ready_at
+
+    @property
+    def response(self):
+        if not self.done or self.failed:
+            return None
+        return types.SimpleNamespace(generated_videos=[types.SimpleNamespace(video=FakeVideo(self.clip_path))])
+
+    @property
+    def error(self):
+        return "Injected video failure" if self.done and self.failed else None
+
+
+class FakeGenai:
+    """Veo long-running operations that finish after a sampled latency."""
+
+    def __init__(self, probe: ProviderProbe, clip_paths: List[str]):
+        self._probe = probe
+        self._clips = itertools.cycle(clip_paths)
+        self.models = types.SimpleNamespace(generate_videos=self._generate_videos)
+        self.operations = types.SimpleNamespace(get=lambda operation: operation)
+        self.files = types.SimpleNamespace(
+            upload=lambda file: types.SimpleNamespace(name=f"files/{uuid.uuid4().hex[:12]}"),
+            delete=lambda name: None,
+            download=lambda file: b"",
+        )
+
+    def _generate_videos(self, model: str, prompt: str, config=None):
+        start = time.perf_counter()
+        operation = FakeOperation(f"operations/{uuid.uuid4().hex[:12]}", start + self._probe.latency.sample(), self._probe.latency.fails(), next(self._clips))
+        # The remote generation is "in flight" from submission until it is ready
+        self._probe.record(start, operation.ready_at, operation.failed)
+        return operation
+
+    def close(self):
+        pass
+
+
+def make_fake_voiceover_engine(probe: ProviderProbe, audio_paths: List[str]):
+    from app.ml.voiceover_engines import VoiceoverEngine
+
+    audios = itertools.cycle(audio_paths)
+
+    class FakeVoiceoverEngine(VoiceoverEngine):
+        name = "benchmark-fake"
+        extension = ".mp3"
+
+        def synthesize(self, text: str, output_path: str):
+            with probe.call():
+                shutil.copyfile(next(audios), output_path)
+
+    return FakeVoiceoverEngine()
+
+
+def install_fakes(probes: dict, media: dict, scenes: int, veo_poll_interval: float):
+    """Routes every provider lookup of the pipeline to the fakes."""
+    from app.core.config import settings
+    from app.ml.clients import clients
+    from app.ml.voiceover_engines import register_voiceover_engine
+
+    settings.VEO_POLL_INITIAL_INTERVAL = veo_poll_interval
+    settings.VEO_POLL_MAX_INTERVAL = veo_poll_interval
+
+    llm = make_fake_chat_model(probes["llm"], scenes)
+    nebius = types.SimpleNamespace(images=FakeImages(probes["image"]))
+    http = FakeHTTP(probes["download"], media["image"])
+    genai = FakeGenai(probes["video"], media["clips"])
+    engine = make_fake_voiceover_engine(probes["tts"], media["audios"])
+
+    # The Veo scheduler is created on first use from the (fake) genai client
+    clients.override(chat=llm, nebius=nebius, http=http, genai=genai)
+    register_voiceover_engine(engine.name, lambda: engine)
+    settings.VOICEOVER_ENGINE = engine.name
+
+
+# ===== Measurement =====
+class StageTimer:
+    """Progress callback recording when each pipeline stage started and completed."""
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def mark(self, stage: str, status: str, **details):
+        now = time.perf_counter() - self._t0
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"start": None, "end": None, "failed_scenes": 0})
+            if status == "started" and entry["start"] is None:
+                entry["start"] = now
+            elif status == "completed":
+                entry["end"] = now
+            elif status == "failed" and details.get("scene_index") is not None:
+                entry["failed_scenes"] += 1
+
+    __call__ = mark
+
+    @contextmanager
+    def stage(self, name: str):
+        self.mark(name, "started")
+        try:
+            yield
+        finally:
+            self.mark(name, "completed")
+
+
+def run_pipeline_once(summary: str, timer: StageTimer) -> str:
+    from app.ml.model_connect import story_generator, complete_video_pipeline
+
+    with timer.stage("story"):
+        story = story_generator(summary)
+    return complete_video_pipeline(story.scenes, output_video_name="benchmark_final.mp4", progress=timer)
+
+
+async def run_routes_once(route_clients: int, timer: StageTimer) -> List[str]:
+    """Drives the step-by-step generation routes for `route_clients` concurrent users."""
+    import httpx
+    from app.main import create_app
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+
+    async def post(client, path: str, payload: dict) -> dict:
+        # Stage wall time spans from the first request to the last response of all users
+        timer.mark(f"route {path}", "started")
+        response = await client.post(f"/api/v1/generate{path}", json=payload)
+        body = response.json()
+        if not body.get("success"):
+            raise RuntimeError(f"{path} failed: {body.get('message')}")
+        timer.mark(f"route {path}", "completed")
+        return body["data"]
+
+    async def user(index: int) -> str:
+        prefix = f"user{index}"
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            story = await post(client, "/story", {"summary": f"Benchmark summary {index}"})
+            images = await post(client, "/images", {"story_data": story["scenes"], "output_dir": f"{prefix}_images"})
+            videos = await post(client, "/videos", {"image_data": images["images"], "output_dir": f"{prefix}_videos"})
+            voices = await post(client, "/voiceovers", {"video_data": videos["videos"], "output_dir": f"{prefix}_voiceovers"})
+            final = await post(client, "/final-video", {"scenes_with_voiceovers": voices["voiceovers"], "output_file": f"{prefix}_final.mp4"})
+            return final["final_video"]
+
+    return await asyncio.gather(*(user(i) for i in range(route_clients)))
+
+
+def max_rss_mb(who) -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("pipeline", "routes"), default="pipeline", help="complete_video_pipeline, or the step-by-step async routes")
+    parser.add_argument("--scenes", type=int, default=8, help="Scenes per story")
+    parser.add_argument("--runs", type=int, default=1, help="Number of benchmark runs")
+    parser.add_argument("--route-clients", type=int, default=4, help="Concurrent users driving the routes (routes mode)")
+    parser.add_argument("--distribution", choices=("fixed", "uniform", "lognormal"), default="uniform", help="Latency distribution of every provider")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Relative spread (uniform) or sigma (lognormal) of the latency")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the latency/failure generator")
+    for provider, latency in (("llm", 2.0), ("image", 1.5), ("download", 0.1), ("video", 6.0), ("tts", 0.8)):
+        parser.add_argument(f"--{provider}-latency", type=float, default=latency, help=f"Mean {provider} latency in seconds")
+        parser.add_argument(f"--{provider}-failure-rate", type=float, default=0.0, help=f"Probability that a {provider} call fails")
+    parser.add_argument("--veo-poll-interval", type=float, default=0.25, help="Veo polling interval used against the fake operations")
+    parser.add_argument("--clip-size", default="640x360", help="Resolution of the synthetic clips")
+    parser.add_argument("--clip-seconds", type=float, default=4.0, help="Duration of the synthetic clips and narration")
+    parser.add_argument("--workdir", help="Directory for outputs and caches (default: a temporary directory)")
+    parser.add_argument("--reuse-workdir", action="store_true", help="Share outputs and caches between runs (warm caches after the first run)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="pipeline-benchmark-"))
+
+    # Settings are read from the Backend .env, so import before leaving the directory
+    os.chdir(BACKEND_DIR)
+    import app.ml.model_connect  # noqa: F401
+    # The pipeline imports these SDKs on first use; import them now so the
+    # one-off import cost (much higher under tracemalloc) stays out of the runs
+    import google.genai.types  # noqa: F401
+    import httpx  # noqa: F401
+    import langchain_core.output_parsers  # noqa: F401
+    import moviepy  # noqa: F401
+    rng = random.Random(args.seed)
+    probes = {
+        provider: ProviderProbe(provider, LatencyModel(
+            getattr(args, f"{provider}_latency"), args.jitter, args.distribution,
+            getattr(args, f"{provider}_failure_rate"), rng,
+        ))
+        for provider in PROVIDERS
+    }
+    media = make_media(os.path.join(workdir, "media"), args.clip_size, args.clip_seconds, variants=args.scenes)
+    install_fakes(probes, media, args.scenes, args.veo_poll_interval)
+
+    results = []
+    for run in range(args.runs):
+        run_dir = workdir if args.reuse_workdir else os.path.join(workdir, f"run{run + 1}")
+        os.makedirs(run_dir, exist_ok=True)
+        # Outputs and caches use relative paths, so each run directory starts cold
+        os.chdir(run_dir)
+        for probe in probes.values():
+            probe.reset()
+
+        timer = StageTimer()
+        tracemalloc.start()
+        start = time.perf_counter()
+        error = None
+        try:
+            if args.mode == "pipeline":
+                run_pipeline_once("Benchmark summary", timer)
+            else:
+                asyncio.run(run_routes_once(args.route_clients, timer))
+        except Exception as e:
+            error = str(e)
+        wall = time.perf_counter() - start
+        _, peak_heap = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.append({
+            "run": run + 1,
+            "mode": args.mode,
+            "wall_seconds": round(wall, 3),
+            "error": error,
+            "stages": timer.stages,
+            "providers": {name: probe.summary() for name, probe in probes.items()},
+            "peak_python_heap_mb": round(peak_heap / 1024 / 1024, 1),
+            "max_rss_mb": round(max_rss_mb(resource.RUSAGE_SELF), 1),
+            "max_child_rss_mb": round(max_rss_mb(resource.RUSAGE_CHILDREN), 1),
+        })
+
+    for result in results:
+        print(f"\nRun {result['run']} ({result['mode']}): {result['wall_seconds']:.2f}s" + (f"  FAILED: {result['error']}" if result["error"] else ""))
+        print(f"  {'stage':<24}{'start':>8}{'end':>8}{'wall':>8}{'failed':>8}")
+        for stage, entry in result["stages"].items():
+            started, ended = entry["start"], entry["end"]
+            wall = f"{ended - started:8.2f}" if started is not None and ended is not None else f"{'-':>8}"
+            print(f"  {stage:<24}{started or 0:8.2f}{ended or 0:8.2f}{wall}{entry['failed_scenes']:>8}")
+        print(f"  {'provider':<24}{'calls':>8}{'failed':>8}{'peak':>8}{'mean s':>8}")
+        for name, summary in result["providers"].items():
+            print(f"  {name:<24}{summary['calls']:>8}{summary['failures']:>8}{summary['peak_concurrency']:>8}{summary['mean_latency']:8.2f}")
+        print(f"  peak Python heap {result['peak_python_heap_mb']} MB, max RSS {result['max_rss_mb']} MB, max ffmpeg RSS {result['max_child_rss_mb']} MB")
+
+    print(f"\nOutputs: {workdir}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
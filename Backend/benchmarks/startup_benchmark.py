@@ -0,0 +1,88 @@
+"""
+Measures API cold-start cost: module import time and FastAPI app creation time.
+
+Every run uses a fresh interpreter, so nothing is served from already-imported
+modules. Run from the Backend directory with the usual environment (.env):
+
+    python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --top 15   # slowest imports (python -X importtime)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter; prints one JSON line with timings in seconds
+MEASURE_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import app.ml.model_connect
+t1 = time.perf_counter()
+import app.main
+t2 = time.perf_counter()
+app.main.create_app()
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_model_connect": t1 - t0,
+    "import_main": t2 - t0,
+    "create_app": t3 - t2,
+    "total": t3 - t0,
+}))
+"""
+
+
+def measure_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    """Returns (cumulative seconds, module) of the slowest imports of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        imports.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    print(f"Startup over {args.runs} runs (seconds):")
+    print(f"  {'metric':<22}{'median':>9}{'min':>9}{'max':>9}")
+    for metric in runs[0]:
+        values = [run[metric] for run in runs]
+        print(f"  {metric:<22}{statistics.median(values):>9.3f}{min(values):>9.3f}{max(values):>9.3f}")
+
+    if args.top:
+        print(f"\nSlowest imports of app.main (cumulative seconds):")
+        for seconds, module in slowest_imports(args.top):
+            print(f"  {seconds:>7.3f}  {module}")
+
+
+if __name__ == "__main__":
+    main()